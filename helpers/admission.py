@@ -0,0 +1,169 @@
+"""
+This module throttles the expensive setup steps run when a locust is hatched.
+
+Registering, logging in and enrolling a user are much more expensive than the
+requests made by a load test once it is running.  When thousands of locusts are
+hatched at once, all of them hit /auto_auth, /login and /change_enrollment at
+the same moment, and those that fail immediately try again.  An admission
+controller smooths this out by limiting, per locust process:
+
+* the number of setup steps running concurrently, and
+* the rate at which setup steps are started (a token bucket).
+
+Both limits are optional.  A locust which fails a setup step should call
+backoff_delay() to find out how long to wait before trying again.
+
+The duration of each setup step, and the time spent waiting to be admitted (when
+a limit is set), are reported to locust under the "setup" request type, so that
+they are kept apart from the steady-state numbers of the load test.
+
+Enable this feature in a load test by running the setup steps through the
+controller:
+
+    from helpers import admission
+    controller = admission.get_controller(max_concurrent=20, rate=10)
+    success = controller.run('register', self.auto_auth, params={'no_login': True})
+"""
+import random
+import time
+
+import gevent
+from gevent.lock import BoundedSemaphore
+from locust import events
+
+REQUEST_TYPE = 'setup'
+
+# The controller shared by all locusts in this process.
+_controller = None
+
+
+class SetupStepFailed(Exception):
+    pass
+
+
+class AdmissionController(object):
+    """
+    Limits the concurrency and rate of setup steps in this process.
+    """
+
+    def __init__(self, max_concurrent=None, rate=None, burst=None):
+        """
+        Arguments:
+            max_concurrent (int): the maximum number of setup steps running at
+                once, or None for no limit.
+            rate (float): the maximum number of setup steps started per second,
+                or None for no limit.
+            burst (int): the number of setup steps which may be started at once
+                after a quiet period.  Defaults to one second worth of rate.
+        """
+        self._semaphore = BoundedSemaphore(max_concurrent) if max_concurrent else None
+        self.rate = rate
+        self.burst = burst or max(1, rate or 0)
+        self._tokens = self.burst
+        self._updated = time.time()
+
+    @property
+    def limited(self):
+        """
+        True if either the concurrency or the rate of setup steps is limited.
+        """
+        return self._semaphore is not None or bool(self.rate)
+
+    def _take_token(self):
+        """
+        Wait until the token bucket allows another setup step to start.
+        """
+        if not self.rate:
+            return
+        while True:
+            now = time.time()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            gevent.sleep((1 - self._tokens) / self.rate)
+
+    def acquire(self):
+        self._take_token()
+        if self._semaphore is not None:
+            self._semaphore.acquire()
+
+    def release(self):
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+    def run(self, name, func, *args, **kwargs):
+        """
+        Run the setup step func once admitted, and report it to locust.
+
+        The step is considered to have failed if func returns a false value.
+
+        Returns:
+            The return value of func.
+        """
+        wait_start = time.time()
+        self.acquire()
+        start_time = time.time()
+        if self.limited:
+            _fire_success('admission_wait', wait_start, start_time)
+        try:
+            result = func(*args, **kwargs)
+        except Exception as error:
+            _fire_failure(name, start_time, time.time(), error)
+            raise
+        finally:
+            self.release()
+
+        if result:
+            _fire_success(name, start_time, time.time())
+        else:
+            _fire_failure(name, start_time, time.time(), SetupStepFailed('{} failed'.format(name)))
+        return result
+
+
+def _fire_success(name, start_time, end_time):
+    events.request_success.fire(
+        request_type=REQUEST_TYPE,
+        name=name,
+        response_time=(end_time - start_time) * 1000,
+        response_length=0,
+    )
+
+
+def _fire_failure(name, start_time, end_time, exception):
+    events.request_failure.fire(
+        request_type=REQUEST_TYPE,
+        name=name,
+        response_time=(end_time - start_time) * 1000,
+        exception=exception,
+    )
+
+
+def backoff_delay(failures, base=1.0, cap=60.0):
+    """
+    Return how many seconds to wait before retrying after consecutive failures.
+
+    Uses exponential backoff with "full jitter", so that locusts which failed
+    together do not all retry together.
+
+    Arguments:
+        failures (int): the number of consecutive failures so far.
+        base (float): the largest delay after the first failure.
+        cap (float): the largest delay after any number of failures.
+    """
+    if failures <= 0:
+        return 0
+    return random.uniform(0, min(cap, base * 2 ** (failures - 1)))
+
+
+def get_controller(max_concurrent=None, rate=None):
+    """
+    Return the AdmissionController shared by all locusts in this process.
+
+    The limits given by the first caller are used.
+    """
+    global _controller  # pylint: disable=global-statement
+    if _controller is None:
+        _controller = AdmissionController(max_concurrent=max_concurrent, rate=rate)
+    return _controller
@@ -1,7 +1,7 @@
 import json
 from locust import TaskSet
 
-from helpers import settings
+from helpers import settings, user_pool
 
 
 class AutoAuthTasks(TaskSet):
@@ -31,10 +31,16 @@ class AutoAuthTasks(TaskSet):
         """
         Logs in with a new, programmatically-generated user account.
         Requires AUTO_AUTH functionality to be enabled in the target edx instance.
+
+        If the USER_POOL_FILE setting is present, an existing account is leased
+        from that pool instead of creating a new one (see helpers.user_pool).
         """
         if 'sessionid' in self.client.cookies:
             del self.client.cookies['sessionid']
 
+        if settings.data.get('USER_POOL_FILE'):
+            return self._pooled_auth(verify_ssl=verify_ssl, params=params, hostname=hostname)
+
         response = self.client.get(
             '{}/auto_auth'.format(hostname),
             name="auto_auth",
@@ -56,3 +62,37 @@ class AutoAuthTasks(TaskSet):
                 pass
 
         return False
+
+    def _pooled_auth(self, verify_ssl=True, params=None, hostname=''):
+        """
+        Lease an account from the user pool and log in with it.
+
+        Like auto_auth, the login is skipped when params contains 'no_login'.
+        Any other auto_auth params (e.g. course_id or roles) must have been
+        given when the pool was created.
+        """
+        user = user_pool.get_pool(settings.data['USER_POOL_FILE']).lease()
+        self._username = user['username']
+        self._email = user['email']
+        self._password = user['password']
+        self._user_id = int(user['user_id'])
+        self._anonymous_user_id = user['anonymous_id']
+
+        if (params or {}).get('no_login'):
+            return True
+
+        # The login endpoint is CSRF protected, so make sure there is a token.
+        if 'csrftoken' not in self.client.cookies:
+            self.client.get('{}/login'.format(hostname), name='auto_auth:csrf', verify=verify_ssl)
+
+        response = self.client.post(
+            '{}{}'.format(hostname, settings.data.get('LOGIN_PATH', '/login_ajax')),
+            data={'email': self._email, 'password': self._password},
+            headers={
+                'X-CSRFToken': self.client.cookies.get('csrftoken', ''),
+                'Referer': hostname or self.locust.host,
+            },
+            name='auto_auth:login',
+            verify=verify_ssl
+        )
+        return response.status_code == 200
@@ -1,5 +1,11 @@
+import cPickle as pickle
+import importlib
+import os
 import random
 
+# POST key name of the inputs of a capa problem, to be followed by the input key.
+CAPA_INPUT_KEY_FORMAT = 'input_i4x-{course_org}-{course_num}-problem-{problem_id}'
+
 
 class CourseData(dict):
     """
@@ -13,7 +19,36 @@ class CourseData(dict):
 
     Tasks should not access the underlying dict directly, instead use or
     add property accessors as needed.
+
+    The same course data may be used for several courses.  Accessors which
+    depend on the course, like capa_submission, need a CourseData bound to a
+    course by for_course().
     """
+    course_org = None
+    course_num = None
+
+    def for_course(self, course_org, course_num):
+        """
+        Return a copy of this CourseData bound to the course with the given org
+        and number.
+        """
+        bound = type(self)(self)
+        bound.course_org = course_org
+        bound.course_num = course_num
+        return bound
+
+    def _capa_input_key_prefix(self, problem_id):
+        """
+        Return the prefix of the POST key names of the inputs of a capa problem.
+        """
+        if self.course_org is None:
+            raise TypeError('Capa submissions need course data bound to a course with for_course().')
+        return CAPA_INPUT_KEY_FORMAT.format(
+            course_org=self.course_org,
+            course_num=self.course_num,
+            problem_id=problem_id,
+        )
+
     @staticmethod
     def _random_item(d):
         key = random.choice(d.keys())
@@ -52,6 +87,16 @@ class CourseData(dict):
                 input[key] = random.choice(values)
         return (problem_id, problem, input)
 
+    @property
+    def capa_submission(self):
+        """
+        Return (id, problem, data) from among capa problems known in this course,
+        where data contains random inputs keyed by their POST key names.
+        """
+        problem_id, problem, input = self.capa_problem
+        post_key_prefix = self._capa_input_key_prefix(problem_id)
+        return (problem_id, problem, {post_key_prefix + key: value for key, value in input.iteritems()})
+
     @property
     def sequential_id(self):
         """
@@ -71,13 +116,98 @@ class CourseData(dict):
         """
         Randomly select an exam id from all known special exams in this course.
 
-        Special exams are either timed exams or proctored exams.
+        Special exams are either timed exams or proctored exams.  Returns None
+        if there are none.
+        """
+        exam_ids = self.get('special_exam_ids')
+        return random.choice(exam_ids) if exam_ids else None
+
+
+def _immutable(*args, **kwargs):
+    raise TypeError('FrozenCourseData is immutable.')
+
+
+class FrozenCourseData(CourseData):
+    """
+    An immutable CourseData, compiled once when it is constructed.
+
+    The accessors of CourseData run on the hot path of the load tests, several
+    times per second per locust, so this implementation does all the work that
+    does not depend on the random selection up front:
+
+    * the capa problems are stored as a tuple, so picking one does not build a
+      list of their ids,
+    * the inputs of each problem are flattened into a tuple of (input key, POST
+      key, choices) triples,
+    * the POST key name of each input is rendered once, when it is bound to a
+      course.
+
+    Since the compiled form is never updated, the underlying dict may not be
+    modified either.  The copies bound to each course are kept, so binding is
+    only done once per course.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(FrozenCourseData, self).__init__(*args, **kwargs)
+        self._courses = {}
+        self._compile()
+
+    def _compile(self):
+        self._capa_problems = tuple(
+            (problem_id, problem, self._compile_inputs(problem_id, problem))
+            for problem_id, problem in sorted(self.get('capa_problems', {}).items())
+        )
+
+    def for_course(self, course_org, course_num):
+        """
+        Return a copy of this FrozenCourseData bound to the course with the
+        given org and number.
+        """
+        course = (course_org, course_num)
+        if course not in self._courses:
+            bound = FrozenCourseData(self)
+            bound.course_org = course_org
+            bound.course_num = course_num
+            bound._compile()
+            self._courses[course] = bound
+        return self._courses[course]
+
+    def _compile_inputs(self, problem_id, problem):
         """
-        return random.choice(self['special_exam_ids'])
+        Flatten the inputs of a capa problem into (input key, POST key,
+        choices) triples.  The POST keys are None until this is bound to a
+        course.
+        """
+        post_key_prefix = None if self.course_org is None else self._capa_input_key_prefix(problem_id)
+        return tuple(
+            (key, None if post_key_prefix is None else post_key_prefix + key, tuple(choices))
+            for key, choices in sorted(problem.get('inputs', {}).items())
+        )
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _immutable
+
+    @property
+    def capa_problem(self):
+        """
+        Return (id, path, inputs) from among capa problems known in this course.
+        """
+        problem_id, problem, inputs = random.choice(self._capa_problems)
+        return (problem_id, problem, {key: random.choice(choices) for key, __, choices in inputs})
+
+    @property
+    def capa_submission(self):
+        """
+        Return (id, problem, data) from among capa problems known in this course,
+        where data contains random inputs keyed by their POST key names.
+        """
+        if self.course_org is None:
+            raise TypeError('Capa submissions need course data bound to a course with for_course().')
+        problem_id, problem, inputs = random.choice(self._capa_problems)
+        return (problem_id, problem, {post_key: random.choice(choices) for __, post_key, choices in inputs})
 
 
 # data extracted from edX/DemoX/Demo_Course as of Feb. 2015
-demo_course = CourseData(
+demo_course = FrozenCourseData(
     sequential_ids=(
         "edx_introduction",
         "basic_questions",
@@ -244,3 +374,23 @@ demo_course = CourseData(
         'i4x://edX/DemoX/html/030e35c4756a4ddc8d40b95fbbfff4d4',
     ),
 )
+
+
+def get(name):
+    """
+    Return the CourseData called name.
+
+    Besides the CourseData defined in this module, this finds the ones
+    generated by util/export_course_data.py, i.e. a FrozenCourseData called
+    name in the module helpers/course_data/<name>.py, or pickled into
+    helpers/course_data/<name>.pickle.
+    """
+    if name in globals():
+        return globals()[name]
+    pickle_filename = os.path.join(os.path.dirname(__file__), name + '.pickle')
+    if os.path.exists(pickle_filename):
+        with open(pickle_filename, 'rb') as pickle_file:
+            globals()[name] = FrozenCourseData(pickle.load(pickle_file))
+    else:
+        globals()[name] = getattr(importlib.import_module('{}.{}'.format(__name__, name)), name)
+    return globals()[name]
@@ -0,0 +1,134 @@
+"""
+This module generates dummy text, such as the bodies of forum posts.
+
+Word lists are loaded once per process into a WordCorpus: the words are
+shuffled (differently in every process) and joined into a single string, and
+the offsets of each word in that string are kept in compact arrays.  Generating
+text then only takes a couple of bisections and a single slice of the corpus,
+whatever its length, while words and phrases are made of independently chosen
+words:
+
+    from helpers import dummy_text
+    body = dummy_text.dummy_text(100, 2000)
+    word = dummy_text.random_word()
+
+Other word lists can be loaded with load_corpus():
+
+    NOTES_TEXT = dummy_text.load_corpus('notes_data/basic_words.txt')
+    search_terms = NOTES_TEXT.phrase(3)
+"""
+from array import array
+import bisect
+import os
+import random
+
+# The word list used by default: a dictionary of english words, one per line.
+DEFAULT_WORDS_FILENAME = os.path.join(os.path.dirname(__file__), 'words.txt')
+
+# Corpora loaded by this process, keyed by filename.
+_corpora = {}
+
+
+class WordCorpus(object):
+    """
+    A list of words, shuffled and joined by single spaces.
+    """
+
+    def __init__(self, words, seed=None):
+        """
+        Arguments:
+            words (list of str): the words, which must not contain spaces.
+            seed: the seed used to shuffle the words, by default seeded from
+                os.urandom() so that every process has its own order.
+
+        Raises:
+            ValueError: If words is empty.
+        """
+        if not words:
+            raise ValueError('A WordCorpus needs at least one word.')
+        words = list(words)
+        random.Random(seed).shuffle(words)
+        self.corpus = ' '.join(words)
+        self.count = len(words)
+
+        # The offsets of the first character of every word, and of the space
+        # following it (or the end of the corpus).
+        self._starts = array('l')
+        self._ends = array('l')
+        offset = 0
+        for word in words:
+            self._starts.append(offset)
+            offset += len(word)
+            self._ends.append(offset)
+            offset += 1
+
+    def word(self):
+        """
+        Return a random word.
+        """
+        index = random.randrange(self.count)
+        return self.corpus[self._starts[index]:self._ends[index]]
+
+    def phrase(self, count):
+        """
+        Return a string of count distinct random words, separated by spaces.
+        """
+        return ' '.join(self.words(count))
+
+    def words(self, count):
+        """
+        Return a list of count distinct random words.
+
+        Each word is chosen independently, rather than as a run of consecutive
+        words of the corpus, so that any combination of words can come up.
+        """
+        return [
+            self.corpus[self._starts[index]:self._ends[index]]
+            for index in random.sample(xrange(self.count), count)
+        ]
+
+    def text(self, minlen, maxlen):
+        """
+        Return random text at least minlen and less than maxlen characters long,
+        starting at a word boundary.
+
+        The text ends at a word boundary too, unless that would make it too
+        long, in which case the last word is cut off.
+
+        Raises:
+            ValueError: If the corpus is shorter than minlen.
+        """
+        desired_length = random.randrange(minlen, maxlen)
+        # Only start at words which are followed by enough text.
+        num_starts = bisect.bisect_right(self._starts, self._ends[-1] - desired_length)
+        if not num_starts:
+            raise ValueError('The corpus is shorter than {} characters.'.format(desired_length))
+        start = self._starts[random.randrange(num_starts)]
+        end = self._ends[bisect.bisect_left(self._ends, start + desired_length)]
+        return self.corpus[start:min(end, start + maxlen - 1)]
+
+
+def load_corpus(filename=DEFAULT_WORDS_FILENAME):
+    """
+    Return the WordCorpus of the whitespace separated words in filename,
+    shared by all callers in this process so that the file is only read once.
+    """
+    if filename not in _corpora:
+        with open(filename) as words_file:
+            _corpora[filename] = WordCorpus(words_file.read().split())
+    return _corpora[filename]
+
+
+def random_word():
+    """
+    Return a random word from the default word list.
+    """
+    return load_corpus().word()
+
+
+def dummy_text(minlen, maxlen):
+    """
+    Return random text between minlen and maxlen characters long, made of
+    words from the default word list.
+    """
+    return load_corpus().text(minlen, maxlen)
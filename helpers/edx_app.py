@@ -6,6 +6,22 @@ from helpers import settings, util, course_data
 from helpers.auto_auth_tasks import AutoAuthTasks
 from helpers.mixins import HeadersTaskSetMixin
 
+# Sampler for the course of each locust client, built from the settings once.
+_course_sampler = None
+
+
+def _get_course_sampler():
+    """
+    Return the WeightedSampler of course ids, weighted by their "ratio" keys.
+    """
+    global _course_sampler  # pylint: disable=global-statement
+    if _course_sampler is None:
+        courses = settings.data['courses']
+        _course_sampler = util.WeightedSampler(
+            [(cid, cdata['ratio']) for cid, cdata in courses.iteritems()]
+        )
+    return _course_sampler
+
 
 class EdxAppTasks(HeadersTaskSetMixin, AutoAuthTasks):
     """
@@ -21,12 +37,9 @@ class EdxAppTasks(HeadersTaskSetMixin, AutoAuthTasks):
         is cached on a per-client basis (due to the @lazy decorator).  It
         randomly selects a course from the "courses" dict specified in the
         settings file.  The "ratio" keys of every course are used to construct
-        a probability distribution.
+        a probability distribution, which is shared by all locust clients.
         """
-        courses = settings.data['courses']
-        course_ratio_pairs = \
-            [(cid, cdata['ratio']) for cid, cdata in courses.iteritems()]
-        return util.choice_with_distribution(course_ratio_pairs)
+        return _get_course_sampler().choice()
 
     @lazy
     def course_key(self):
@@ -59,10 +72,11 @@ class EdxAppTasks(HeadersTaskSetMixin, AutoAuthTasks):
     @lazy
     def course_data(self):
         """
-        Accessor for the CourseData instance we're configured to test with.
+        Accessor for the CourseData instance we're configured to test with,
+        bound to the course under test.
         """
         course_data_name = self._get_course_setting('course_data')
-        return getattr(course_data, course_data_name)
+        return course_data.get(course_data_name).for_course(self.course_org, self.course_num)
 
     def _get_course_setting(self, setting):
         """
@@ -0,0 +1,76 @@
+"""
+This module queues events and sends them in batches, the way the event queue
+of a browser sends analytics events.
+
+A batch is sent as soon as it is full, or once its first event has been queued
+for the batch interval, whichever comes first.  The interval is timed by a
+greenlet, so a batch is sent on time even if no more events are queued, e.g.
+because the locust has moved on to other tasks or was stopped.  Batches still
+queued when locust quits are sent by flush_all().
+
+    from helpers import event_queue
+    queue = event_queue.EventQueue(send_batch, draw_size=lambda: 10, draw_interval=lambda: 30)
+    queue.put(event)
+"""
+import gevent
+
+# The queues of this process which have events waiting to be sent.
+_pending = set()
+
+
+class EventQueue(object):
+    """
+    Queues events, and passes them on to send() in batches.
+    """
+
+    def __init__(self, send, draw_size, draw_interval):
+        """
+        Arguments:
+            send (callable): called with the list of events of each batch.
+            draw_size (callable): returns the number of events of the next
+                batch.
+            draw_interval (callable): returns the maximum number of seconds
+                the first event of the next batch is queued for.
+        """
+        self.send = send
+        self.draw_size = draw_size
+        self.draw_interval = draw_interval
+        self._events = []
+        self._size = None
+        self._timer = None
+
+    def __len__(self):
+        return len(self._events)
+
+    def put(self, event):
+        """
+        Queue an event, sending the batch if it is full.
+        """
+        if not self._events:
+            self._size = self.draw_size()
+            self._timer = gevent.spawn_later(self.draw_interval(), self.flush)
+            _pending.add(self)
+        self._events.append(event)
+        if len(self._events) >= self._size:
+            self.flush()
+
+    def flush(self):
+        """
+        Send the queued events now, if there are any.
+        """
+        if self._timer is not None and self._timer is not gevent.getcurrent():
+            self._timer.kill(block=False)
+        self._timer = None
+        _pending.discard(self)
+        events, self._events = self._events, []
+        if events:
+            self.send(events)
+
+
+def flush_all():
+    """
+    Send the queued events of every queue of this process, e.g. when locust
+    quits.
+    """
+    for queue in list(_pending):
+        queue.flush()
@@ -0,0 +1,193 @@
+"""
+This file defines the flatten_tasks decorator for composite TaskSets.
+
+If your load test only has one TaskSet, ignore this utility.  Else, read on...
+
+Normally the locust client gets captured by a child TaskSet, and only escapes
+back to the parent TaskSet when it runs a task which calls interrupt(),
+conventionally named "stop".  Every time the parent picks a child TaskSet
+again, locust creates a new instance of it and runs its on_start, which for
+most of our TaskSets means more setup requests (auto_auth, enrollment, and
+whatever else the child needs).  The traffic mix also depends on the weights of
+the "stop" tasks rather than only on the weights given to the child TaskSets.
+
+The flatten_tasks class decorator replaces all of that with a single weighted
+table of tasks, computed once when the class is created.  Each task of a child
+TaskSet gets the weight:
+
+    (weight of the child TaskSet) / (total weight of the parent's tasks)
+        * (weight of the task) / (total weight of the child's tasks)
+
+where "stop" tasks are left out.  A locust picks tasks from this table without
+ever interrupting, so it runs tasks from every child TaskSet.  Each child
+TaskSet is instantiated (and its on_start run) only once per locust; if its
+on_start interrupts, e.g. because enrollment failed, it is retried the next
+time one of its tasks is picked.  If on_start raises any other exception, the
+child's tasks are skipped for a while, backing off after each failure, rather
+than raising the same exception on every pick.
+
+Since on_start no longer runs whenever a child is picked again, a child whose
+setup can be undone by a task (e.g. a task logging out) should define
+ensure_setup(), which is called before each of its tasks, and should be cheap
+when there is nothing to do.  It may interrupt to skip the task.
+
+Use it on the TaskSet which pulls the child TaskSets together:
+
+    @flatten_tasks
+    class LmsTest(LmsTasks):
+        tasks = {
+            CoursewareViewsTasks: 5,
+            TrackingTasks: 24,
+        }
+
+"""
+import bisect
+from collections import OrderedDict
+import logging
+import random
+import time
+
+from locust.exception import InterruptTaskSet
+
+from helpers.admission import backoff_delay
+
+LOG = logging.getLogger(__name__)
+
+# Name of the tasks which hand control back to the parent TaskSet.
+STOP_TASK_NAME = 'stop'
+
+# Name of the method of child TaskSets called before each of their tasks.
+ENSURE_SETUP_NAME = 'ensure_setup'
+
+# The longest time, in seconds, the tasks of a child whose on_start failed are
+# skipped for.
+SETUP_BACKOFF_MAX = 300.0
+
+
+def _is_task_set(task):
+    """
+    Return True if task is a TaskSet class, tested the same way locust does.
+    """
+    return isinstance(task, type) and hasattr(task, 'tasks')
+
+
+def _collapse(tasks):
+    """
+    Collapse a locust tasks list, in which each task is repeated as many times
+    as its weight, into a list of (task, weight) pairs.
+    """
+    weights = OrderedDict()
+    for task in tasks:
+        weights[task] = weights.get(task, 0) + 1
+    return weights.items()
+
+
+def flat_task_weights(task_set_class):
+    """
+    Compute the flattened task table of task_set_class.
+
+    Returns:
+        list of (child TaskSet class, task, weight) tuples, where the child
+        TaskSet class is None for tasks of task_set_class itself, and the
+        weights add up to 1.
+    """
+    entries = []
+    tasks = _collapse(task_set_class.tasks)
+    total = float(sum(weight for __, weight in tasks))
+    for task, weight in tasks:
+        share = weight / total
+        if not _is_task_set(task):
+            entries.append((None, task, share))
+            continue
+
+        child_tasks = [
+            (child_task, child_weight) for child_task, child_weight in _collapse(task.tasks)
+            if getattr(child_task, '__name__', None) != STOP_TASK_NAME
+        ]
+        child_total = float(sum(child_weight for __, child_weight in child_tasks))
+        for child_task, child_weight in child_tasks:
+            entries.append((task, child_task, share * child_weight / child_total))
+    return entries
+
+
+def _get_child(task_set, child_class):
+    """
+    Return the instance of child_class belonging to task_set, creating it and
+    running its on_start the first time.
+
+    Returns None if on_start interrupted, or if it raised another exception
+    recently.  The exception is raised again the first time, so that locust
+    reports it.
+    """
+    children = task_set.__dict__.setdefault('_flat_children', {})
+    child = children.get(child_class)
+    if child is not None:
+        return child
+
+    # (number of consecutive failures, time of the next attempt) of each child
+    # whose on_start raised.
+    failures = task_set.__dict__.setdefault('_flat_setup_failures', {})
+    failure_count, retry_time = failures.get(child_class, (0, 0))
+    if time.time() < retry_time:
+        return None
+
+    child = child_class(task_set)
+    try:
+        if hasattr(child, 'on_start'):
+            child.on_start()
+    except InterruptTaskSet:
+        return None
+    except Exception:
+        failure_count += 1
+        delay = backoff_delay(failure_count, cap=SETUP_BACKOFF_MAX)
+        failures[child_class] = (failure_count, time.time() + delay)
+        LOG.warning('on_start of %s failed, skipping its tasks for %.1fs', child_class.__name__, delay)
+        raise
+    failures.pop(child_class, None)
+    children[child_class] = child
+    return child
+
+
+def _flat_task(child_class, task):
+    """
+    Wrap a task of child_class so that it can be run by the parent TaskSet.
+    """
+    def flat_task(self):
+        child = _get_child(self, child_class)
+        if child is None:
+            return
+        try:
+            if hasattr(child, ENSURE_SETUP_NAME):
+                getattr(child, ENSURE_SETUP_NAME)()
+            child.execute_task(task)
+        except InterruptTaskSet:
+            # There is no parent to switch to: stay here and pick another task.
+            pass
+
+    flat_task.__name__ = getattr(task, '__name__', flat_task.__name__)
+    return flat_task
+
+
+def _get_next_task(self):
+    cumulative_weights = self._flat_cumulative_weights
+    index = bisect.bisect(cumulative_weights, random.random() * cumulative_weights[-1])
+    return self._flat_tasks[index]
+
+
+def flatten_tasks(task_set_class):
+    """
+    Class decorator for a TaskSet which makes it pick tasks from the flattened
+    task table of its child TaskSets, instead of switching between them.
+    """
+    flat_tasks = []
+    cumulative_weights = []
+    total = 0
+    for child_class, task, weight in flat_task_weights(task_set_class):
+        flat_tasks.append(task if child_class is None else _flat_task(child_class, task))
+        total += weight
+        cumulative_weights.append(total)
+
+    task_set_class._flat_tasks = flat_tasks
+    task_set_class._flat_cumulative_weights = cumulative_weights
+    task_set_class.get_next_task = _get_next_task
+    return task_set_class
@@ -0,0 +1,169 @@
+"""
+This module breaks the time taken by Studio course imports down by stage.
+
+While a course is imported, Studio's /import_status endpoint reports an
+ImportStatus which moves through numbered stages:
+
+    0: no status found
+    1: unpacking the tarball
+    2: verifying the OLX
+    3: updating the modulestore
+    4: done
+
+A negative ImportStatus means that the import failed during the matching stage.
+
+Studio keeps the status in the session of the user who uploaded the course, and
+reports 0 whenever it can't find it there: before the import has started, e.g.
+while the upload is still being processed, but also once the status was lost,
+e.g. because the session was.  A 0 after any other status is therefore an end
+of the import, with an unknown outcome, rather than a stage of it.
+
+A load test sampling the status records each transition as (status, time), and
+turns those into the time spent in each stage with stage_durations().  The
+durations of each import are also logged, so that util/generate_summary.py can
+add a table of the p50/p95 duration of each stage to the summary of the run:
+
+    from helpers import import_timeline
+    durations = import_timeline.stage_durations(transitions)
+    import_timeline.log_stage_durations(durations)
+"""
+import json
+import logging
+import re
+
+LOG = logging.getLogger(__name__)
+
+IMPORT_STATUS_NONE = 0
+
+STAGE_NAMES = {
+    0: 'no status',
+    1: 'unpacking',
+    2: 'verifying',
+    3: 'updating',
+}
+
+IMPORT_STATUS_SUCCESS = 4
+
+LOG_MESSAGE_PREFIX = 'course import stages: '
+
+
+def status_lost(transitions):
+    """
+    Return True if the status of an import went back to 0 after another
+    status was seen.
+    """
+    return len(transitions) > 1 and transitions[-1][0] == IMPORT_STATUS_NONE
+
+
+def import_ended(transitions):
+    """
+    Return True once the status of an import shows that there is no point in
+    sampling it further: the import succeeded, failed, or its status was lost.
+    """
+    if not transitions:
+        return False
+    status = transitions[-1][0]
+    return status == IMPORT_STATUS_SUCCESS or status < 0 or status_lost(transitions)
+
+
+def stage_durations(transitions, end_time=None):
+    """
+    Compute the time spent in each stage of an import.
+
+    A stage is considered to start when its status is first seen, so the
+    precision of the durations is that of the sampling of the status.
+
+    Arguments:
+        transitions (list): (status, time) tuples in the order the statuses
+            were seen, with the time in seconds.
+        end_time (float): when the status stopped being sampled, e.g. because
+            the import timed out.  A stage still running by then is recorded as
+            failed, having lasted until end_time.
+
+    Returns:
+        list of (stage name, duration in seconds, success) tuples, where
+        success is False for the stage an import failed in, or was last seen
+        in before its status was lost.  A stage which failed without ever
+        being seen running gets a duration of 0.
+    """
+    durations = []
+    for index, (status, start_time) in enumerate(transitions):
+        if status == IMPORT_STATUS_NONE and index:
+            # The status was lost, which ends the import rather than starting
+            # a stage.
+            continue
+        elif status < 0:
+            failed_stage = -status
+            previous_status = transitions[index - 1][0] if index else None
+            if failed_stage in STAGE_NAMES and previous_status != failed_stage:
+                durations.append((STAGE_NAMES[failed_stage], 0.0, False))
+        elif status in STAGE_NAMES:
+            if index + 1 < len(transitions):
+                next_status, stage_end_time = transitions[index + 1]
+                success = next_status not in (-status, IMPORT_STATUS_NONE)
+                durations.append((STAGE_NAMES[status], stage_end_time - start_time, success))
+            elif end_time is not None:
+                durations.append((STAGE_NAMES[status], end_time - start_time, False))
+    return durations
+
+
+def log_stage_durations(durations):
+    """
+    Log the stage durations of an import, for parse_logfile_stage_durations().
+    """
+    LOG.info(LOG_MESSAGE_PREFIX + json.dumps(durations))
+
+
+def parse_logfile_stage_durations(line_str):
+    """
+    Parse a logfile line as the stage durations of an import.
+
+    Returns:
+        list of (stage name, duration, success) tuples, or None if the line
+        doesn't contain stage durations.
+    """
+    match = re.search('/INFO/{}: {}(.*)$'.format(re.escape(__name__), re.escape(LOG_MESSAGE_PREFIX)), line_str)
+    if match is None:
+        return None
+    return [tuple(duration) for duration in json.loads(match.group(1))]
+
+
+def percentile(values, percent):
+    """
+    Return the given percentile of values, using the nearest-rank method.
+    """
+    ordered = sorted(values)
+    rank = max(1, int(round(percent / 100.0 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def summarize(all_durations):
+    """
+    Summarize the stage durations of many imports.
+
+    Arguments:
+        all_durations (iterable): the stage durations of each import, as
+            returned by stage_durations().
+
+    Returns:
+        list of dicts with the stage, count, failures, p50 and p95 (in
+        seconds) of each stage seen, in stage order.
+    """
+    by_stage = {}
+    failures = {}
+    for durations in all_durations:
+        for stage, duration, success in durations:
+            by_stage.setdefault(stage, []).append(duration)
+            failures[stage] = failures.get(stage, 0) + (0 if success else 1)
+
+    return [
+        {
+            'stage': stage,
+            'count': len(by_stage[stage]),
+            'failures': failures[stage],
+            'p50': round(percentile(by_stage[stage], 50), 3),
+            'p95': round(percentile(by_stage[stage], 95), 3),
+        }
+        for __, stage in sorted(STAGE_NAMES.items())
+        if stage in by_stage
+    ]
@@ -0,0 +1,72 @@
+"""
+This module caches JWTs fetched from the LMS, e.g. the tokens used to
+authenticate with the notes service.
+
+Tokens are kept per process and keyed by username, so that a user's token
+outlives the TaskSet which fetched it: locust creates nested TaskSets anew
+every time they are picked, and several locusts may lease the same user from a
+pool (see helpers.user_pool).  A token is reused until it is within the refresh
+margin of the expiration read from its payload.
+"""
+import base64
+import json
+import time
+
+
+def jwt_expiration(token):
+    """
+    Return the "exp" claim of `token` as a unix timestamp, or None if the token
+    cannot be decoded.
+
+    The signature is not verified, we only need to know when to ask the LMS
+    for a new token.
+    """
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(payload))['exp'])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class JWTCache(object):
+    """
+    Unexpired JWTs, keyed by username.
+    """
+
+    def __init__(self, refresh_margin):
+        self.refresh_margin = refresh_margin
+        # username: (token, expiration)
+        self._tokens = {}
+
+    def _is_fresh(self, expiration, now):
+        return expiration - self.refresh_margin > now
+
+    def get(self, username, now=None):
+        """
+        Return the cached token of username, or None if there is none, or it is
+        within the refresh margin of expiring.
+        """
+        cached = self._tokens.get(username)
+        if cached is None or not self._is_fresh(cached[1], now or time.time()):
+            return None
+        return cached[0]
+
+    def save(self, username, token, now=None):
+        """
+        Cache the token of username.
+
+        A token without a readable expiration is not cached, since there is no
+        telling how long it is good for.  Tokens which are due for a refresh
+        are dropped along the way, so that the cache only grows with the
+        number of active users.
+        """
+        now = now or time.time()
+        self._tokens = {
+            cached_username: cached
+            for cached_username, cached in self._tokens.iteritems()
+            if cached_username != username and self._is_fresh(cached[1], now)
+        }
+        expiration = jwt_expiration(token)
+        if expiration is not None:
+            self._tokens[username] = (token, expiration)
@@ -0,0 +1,63 @@
+"""
+This module generates filler data for request payloads.
+
+Load tests often only care about the size of what they send, not its contents.
+Generating random filler one character at a time for every request costs a lot
+of CPU on the load generating machine, so instead a large random buffer is
+generated once per process, and filler strings are cut out of it at random
+offsets:
+
+    from helpers import payloads
+    filler = payloads.random_simple_string(1336)
+"""
+import os
+import random
+from string import ascii_letters, digits
+
+# Filler is made of these characters only, since they are 1 byte long in utf-8
+# and won't expand into escapes when converting to json or urlencoding.
+SIMPLE_CHARS = ascii_letters + digits
+
+# Maps every byte to one of SIMPLE_CHARS, for use with str.translate().
+_SIMPLE_CHARS_TABLE = ''.join(SIMPLE_CHARS[byte % len(SIMPLE_CHARS)] for byte in xrange(256))
+
+# Size of the buffer shared by this process.  Much larger than any payload, so
+# that payloads cut out of it are unlikely to repeat.
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+# The buffer shared by this process.
+_buffer = None
+
+
+class RandomStringBuffer(object):
+    """
+    A large random string of SIMPLE_CHARS, from which shorter random strings
+    are cut.
+    """
+
+    def __init__(self, size=DEFAULT_BUFFER_SIZE):
+        self.size = size
+        self._data = os.urandom(size).translate(_SIMPLE_CHARS_TABLE)
+
+    def get(self, length):
+        """
+        Return a random string of SIMPLE_CHARS of the given length.
+
+        Raises:
+            ValueError: If length is larger than the buffer.
+        """
+        if length > self.size:
+            raise ValueError('Cannot get {} characters from a buffer of {}.'.format(length, self.size))
+        offset = random.randint(0, self.size - length)
+        return self._data[offset:offset + length]
+
+
+def random_simple_string(length):
+    """
+    Return a random string of SIMPLE_CHARS of the given length, cut from the
+    buffer shared by this process.
+    """
+    global _buffer  # pylint: disable=global-statement
+    if _buffer is None:
+        _buffer = RandomStringBuffer()
+    return _buffer.get(length)
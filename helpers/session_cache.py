@@ -0,0 +1,88 @@
+"""
+This module persists the session cookies of users between load test runs.
+
+When users are leased from a pool (see helpers.user_pool), the same accounts
+are used by every run against an environment.  Rather than logging each of them
+in again, their session cookies can be saved after a successful login and
+restored by the next run.  Enable this by pointing the SESSION_CACHE_DIR setting
+at a local directory:
+
+    SESSION_CACHE_DIR: /tmp/lms-sessions
+
+Each user's cookies are stored in their own small JSON file, which is replaced
+atomically so that concurrent locust processes never see a partial write.
+"""
+import json
+import os
+import tempfile
+import urllib
+
+# Cookies which make up a logged in session.
+SESSION_COOKIES = ('sessionid', 'csrftoken')
+
+# Caches used by this process, keyed by directory.
+_caches = {}
+
+
+class SessionCache(object):
+    """
+    A directory of saved session cookies, keyed by username.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        try:
+            os.makedirs(directory)
+        except OSError:
+            # Most likely the directory already exists.
+            if not os.path.isdir(directory):
+                raise
+
+    def _path(self, username):
+        return os.path.join(self.directory, urllib.quote(username, safe='') + '.json')
+
+    def save(self, username, cookies):
+        """
+        Save the session cookies found in the given cookie jar.
+
+        Arguments:
+            username (str): the user who owns the session.
+            cookies (dict-like): e.g. the cookie jar of a locust client.
+        """
+        session = {name: cookies.get(name) for name in SESSION_COOKIES if cookies.get(name)}
+        if 'sessionid' not in session:
+            return
+        fd, temp_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, 'w') as temp_file:
+            json.dump(session, temp_file)
+        os.rename(temp_path, self._path(username))
+
+    def load(self, username):
+        """
+        Return the saved session cookies for username as a dict, or None if
+        there are none.
+        """
+        try:
+            with open(self._path(username)) as session_file:
+                return json.load(session_file)
+        except (IOError, ValueError):
+            return None
+
+    def discard(self, username):
+        """
+        Forget the saved session of username, e.g. because it has expired.
+        """
+        try:
+            os.remove(self._path(username))
+        except OSError:
+            pass
+
+
+def get_cache(directory):
+    """
+    Return the SessionCache for directory, shared by all callers in this
+    process.
+    """
+    if directory not in _caches:
+        _caches[directory] = SessionCache(directory)
+    return _caches[directory]
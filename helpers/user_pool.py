@@ -0,0 +1,144 @@
+"""
+This module manages a pool of pre-provisioned user accounts.
+
+Creating a brand new user through auto_auth for every hatched locust turns the
+start of a load test into a stampede of account creation on the LMS.  Instead,
+accounts can be created ahead of time into a pool file:
+
+    python -m util.create_user_pool --host=https://courses.example.com --count=5000 users.csv
+
+and then leased during the test by setting USER_POOL_FILE in the settings file
+of the load test:
+
+    USER_POOL_FILE: users.csv
+
+With that setting present, AutoAuthTasks.auto_auth() leases an existing account
+from the pool and logs in with it, rather than creating a new account.
+
+Leases are handed out round-robin to all locust processes on the same host via
+an index file guarded by an exclusive lock.  After every account in the pool has
+been leased, leasing wraps around to the first account again, so the pool should
+contain at least as many accounts as there will be concurrent locust users.
+"""
+import csv
+import fcntl
+import os
+
+# Columns of the pool file, matching the keys of the auto_auth JSON response.
+POOL_FIELDS = ['username', 'email', 'password', 'user_id', 'anonymous_id']
+
+# Pools loaded by this process, keyed by pool filename.
+_pools = {}
+
+
+class UserPoolError(Exception):
+    pass
+
+
+class UserPool(object):
+    """
+    A CSV file of user accounts, along with an index file which tracks the next
+    account to lease.
+    """
+
+    def __init__(self, pool_filename, index_filename=None):
+        self.pool_filename = pool_filename
+        self.index_filename = index_filename or pool_filename + '.lease'
+        self._users = None
+
+    @property
+    def users(self):
+        """
+        All complete user records in the pool, read from the pool file once.
+        """
+        if self._users is None:
+            self._users = self.read()
+        return self._users
+
+    def read(self):
+        """
+        Read the pool file.
+
+        Rows which were only partially written, e.g. because the pool creation
+        was interrupted, are skipped.
+
+        Returns:
+            list of dicts, each with the keys in POOL_FIELDS.
+        """
+        if not os.path.exists(self.pool_filename):
+            return []
+        with open(self.pool_filename, 'rb') as pool_file:
+            return [
+                row for row in csv.DictReader(pool_file)
+                if all(row.get(field) for field in POOL_FIELDS)
+            ]
+
+    def append(self, users):
+        """
+        Append user records to the pool file, creating it if needed.
+
+        Arguments:
+            users (iterable of dict): records with (at least) the keys in
+                POOL_FIELDS.
+        """
+        self._truncate_partial_row()
+        write_header = not os.path.exists(self.pool_filename) or not os.path.getsize(self.pool_filename)
+        with open(self.pool_filename, 'ab') as pool_file:
+            writer = csv.DictWriter(pool_file, POOL_FIELDS, extrasaction='ignore')
+            if write_header:
+                writer.writeheader()
+            for user in users:
+                writer.writerow(user)
+                pool_file.flush()
+        self._users = None
+
+    def _truncate_partial_row(self):
+        """
+        Drop a trailing row without a line terminator, so that appending does
+        not glue a new row onto it.
+        """
+        if not os.path.exists(self.pool_filename) or not os.path.getsize(self.pool_filename):
+            return
+        with open(self.pool_filename, 'rb+') as pool_file:
+            pool_file.seek(-1, os.SEEK_END)
+            if pool_file.read(1) != '\n':
+                pool_file.seek(0)
+                pool_file.truncate(pool_file.read().rfind('\n') + 1)
+
+    def lease(self):
+        """
+        Lease the next user from the pool.
+
+        Returns:
+            dict with the keys in POOL_FIELDS.
+
+        Raises:
+            UserPoolError: If the pool contains no users.
+        """
+        users = self.users
+        if not users:
+            raise UserPoolError('The user pool {} is empty.'.format(self.pool_filename))
+
+        index_fd = os.open(self.index_filename, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(index_fd, fcntl.LOCK_EX)
+            index = os.read(index_fd, 32).strip()
+            index = int(index) if index else 0
+            os.lseek(index_fd, 0, os.SEEK_SET)
+            os.ftruncate(index_fd, 0)
+            os.write(index_fd, str(index + 1))
+        finally:
+            fcntl.flock(index_fd, fcntl.LOCK_UN)
+            os.close(index_fd)
+
+        return users[index % len(users)]
+
+
+def get_pool(pool_filename):
+    """
+    Return the UserPool for pool_filename, shared by all callers in this
+    process so that the pool file is only read once.
+    """
+    if pool_filename not in _pools:
+        _pools[pool_filename] = UserPool(pool_filename)
+    return _pools[pool_filename]
@@ -4,6 +4,95 @@ Generally helpful utilities for edx load testing.
 from random import random
 
 
+class WeightedSampler(object):
+    """
+    Randomly choose elements with probabilities given by ratios.
+
+    Unlike choice_with_distribution, all the work of normalizing the ratios is
+    done once, when the sampler is constructed, using Vose's alias method.
+    After that, every choice takes constant time no matter how many elements
+    there are, so keep a sampler around when choosing from the same
+    distribution repeatedly:
+
+        SAMPLER = WeightedSampler([('hello', 12), ('world', 20)])
+        SAMPLER.choice()  # 'hello' or 'world'
+        SAMPLER.sample(100)  # a list of 100 choices
+    """
+
+    def __init__(self, element_ratio_pairs):
+        """
+        Args:
+            element_ratio_pairs (list): List of two-tuples containing the
+                element and its ratio (int or float).  The ratios do not need
+                to add up to 1.0.
+
+        Raises:
+            ValueError: If the input list is empty, or the ratios add up to
+                zero.
+        """
+        if not element_ratio_pairs:
+            raise ValueError('element_ratio_pairs is empty.')
+        elements, ratios = zip(*element_ratio_pairs)
+        ratios_sum = float(sum(ratios))
+        if ratios_sum <= 0:
+            raise ValueError('The ratios in element_ratio_pairs add up to zero.')
+
+        # Scale the ratios so that they average to 1.0, then split them into
+        # columns of height 1.0, each holding part of at most two elements: the
+        # element itself (with probability self._probabilities[i]) and its
+        # "alias".
+        count = len(elements)
+        scaled = [ratio * count / ratios_sum for ratio in ratios]
+        probabilities = [1.0] * count
+        aliases = range(count)
+        small = [i for i, ratio in enumerate(scaled) if ratio < 1.0]
+        large = [i for i, ratio in enumerate(scaled) if ratio >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            probabilities[less] = scaled[less]
+            aliases[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Whatever is left over in either list is only there because of
+        # floating point error, and keeps a probability of 1.0.
+
+        self.elements = elements
+        self._count = count
+        self._probabilities = probabilities
+        self._aliases = aliases
+
+    def choice(self):
+        """
+        Returns:
+            A randomly chosen element.
+        """
+        # Use the integer part of the random variable to pick a column, and the
+        # fractional part to pick one of the two elements in it.
+        random_variable = random() * self._count
+        column = int(random_variable)
+        if random_variable - column < self._probabilities[column]:
+            return self.elements[column]
+        return self.elements[self._aliases[column]]
+
+    def sample(self, k):
+        """
+        Returns:
+            A list of k randomly chosen elements, chosen independently (i.e.
+            with replacement).
+        """
+        elements, count = self.elements, self._count
+        probabilities, aliases = self._probabilities, self._aliases
+        chosen = []
+        for __ in xrange(k):
+            random_variable = random() * count
+            column = int(random_variable)
+            if random_variable - column < probabilities[column]:
+                chosen.append(elements[column])
+            else:
+                chosen.append(elements[aliases[column]])
+        return chosen
+
+
 def choice_with_distribution(element_ratio_pairs):
     """
     Randomly choose an element with probabilities given by ratios.
@@ -12,6 +101,9 @@ def choice_with_distribution(element_ratio_pairs):
     element with probability proportional to the corresponding ratio.  The
     ratios do not need to add up to 1.0.
 
+    When choosing from the same distribution repeatedly, use a WeightedSampler
+    instead, which only normalizes the ratios once.
+
     Args:
         element_ratio_pairs (list): List of two-tuples containing the element
             and its ratio (int or float).  E.g. [('hello', 12), ('world', 20)]
@@ -21,19 +113,5 @@ def choice_with_distribution(element_ratio_pairs):
 
     Raises:
         ValueError: If the input list is empty.
-        RuntimeError: If there is a bug in this function which causes no
-            element to get chosen.
     """
-    if not element_ratio_pairs:
-        raise ValueError('element_ratio_pairs is empty.')
-    ratios_sum = sum(pair[1] for pair in element_ratio_pairs)
-    random_variable = random()  # possible values are [0.0, 1.0)
-    # The element is chosen based on iteratively decreasing the random variable
-    # by the normalized ratio of each element until it becomes negative.
-    for elem, ratio in element_ratio_pairs:
-        ratio_normalized = float(ratio) / ratios_sum
-        random_variable -= ratio_normalized
-        if random_variable < 0:
-            return elem
-    raise RuntimeError(
-        "Exited element selection loop without making a selection.")
+    return WeightedSampler(element_ratio_pairs).choice()
@@ -10,11 +10,13 @@ import sys
 # due to locust sys.path manipulation, we need to re-add the project root.
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
+import mmap
 import random
 import time
 
 from locust import HttpLocust, TaskSet, task, events
-from helpers import settings, markers
+from helpers import settings, markers, import_timeline
+from helpers.import_timeline import IMPORT_STATUS_SUCCESS
 
 settings.init(
     __name__,
@@ -30,6 +32,45 @@ settings.init(
 
 markers.install_event_markers()
 
+# Studio accepts course tarballs in chunks of up to this many bytes.
+UPLOAD_CHUNK_SIZE = settings.data.get('UPLOAD_CHUNK_SIZE', 2 * (10 ** 7))
+
+# Polling of the import status starts at this interval, in seconds, and backs
+# off up to IMPORT_STATUS_MAX_INTERVAL, until IMPORT_TIMEOUT.  The interval is
+# reset whenever the import moves to another stage, so that the stage
+# durations stay precise.
+IMPORT_STATUS_INTERVAL = settings.data.get('IMPORT_STATUS_INTERVAL', 0.1)
+IMPORT_STATUS_MAX_INTERVAL = settings.data.get('IMPORT_STATUS_MAX_INTERVAL', 5)
+IMPORT_TIMEOUT = settings.data.get('IMPORT_TIMEOUT', 600)
+
+# The course tarball, memory-mapped once and shared by all locusts in this
+# process.
+_tarball = None
+
+
+def get_tarball():
+    """
+    Return the course tarball of TEST_FILE, memory-mapped.
+    """
+    global _tarball  # pylint: disable=global-statement
+    if _tarball is None:
+        with open(settings.data['TEST_FILE'], "rb") as test_fp:
+            _tarball = mmap.mmap(test_fp.fileno(), 0, access=mmap.ACCESS_READ)
+    return _tarball
+
+
+def _fire_import_event(name, start_time, end_time, success, exception=None):
+    if success:
+        events.request_success.fire(request_type="http",
+                                    name=name,
+                                    response_time=(end_time - start_time) * 1000,
+                                    response_length=0)
+    else:
+        events.request_failure.fire(request_type="http",
+                                    name=name,
+                                    response_time=(end_time - start_time) * 1000,
+                                    exception=exception)
+
 
 class CourseImport(TaskSet):
     "Course import task set -- creates course and imports tarballs."
@@ -96,46 +137,112 @@ class CourseImport(TaskSet):
         if response.status_code != 200:
             raise Exception('Course creation failed: ' + response.text)
 
-    def import_course(self, num):
-        "Import a course over run number 'num'."
+    def upload_course(self, import_url, ifname):
+        """
+        Upload the course tarball to import_url in chunks, the way Studio's
+        import page does.
 
-        with open(settings.data['TEST_FILE'], "rb") as test_fp:
-            cid = "course-v1:LocustX+Soup101+X{0:02d}".format(num)
-            import_url = "/import/{0}".format(cid)
-            ifname = "some{0:08d}.tar.gz".format(int(random.random() * 1e8))
-            self.client.get(import_url, name="/import")
-            start_time = time.time()
+        Each chunk is a view into the memory-mapped tarball, so the file is
+        neither re-read nor copied for every import.
+
+        Returns:
+            True if every chunk was accepted.
+        """
+        tarball = get_tarball()
+        size = len(tarball)
+        headers = {'referer': "{0}{1}".format(self.client.base_url, import_url),
+                   'accept': 'application/json',
+                   'X-CSRFToken': self.client.cookies['csrftoken']}
+        for start in xrange(0, size, UPLOAD_CHUNK_SIZE):
+            chunk = buffer(tarball, start, UPLOAD_CHUNK_SIZE)
+            headers['Content-Range'] = 'bytes {0}-{1}/{2}'.format(start, start + len(chunk) - 1, size)
             resp = self.client.post(import_url,
                                     name="/import",
-                                    headers={'referer':
-                                             "{0}{1}".format(
-                                                 self.client.base_url,
-                                                 import_url),
-                                             'accept': 'application/json',
-                                             'X-CSRFToken':
-                                             self.client.cookies['csrftoken']},
+                                    headers=headers,
                                     files={'course-data':
                                            (ifname,
-                                            test_fp,
+                                            chunk,
                                             "application/x-compressed")})
             if resp.status_code != 200:
-                raise Exception('Course import failed.')
-            for _ in xrange(100):
-                resp = self.client.get("/import_status/{0}/{1}".format(cid,
-                                                                       ifname),
-                                       name="/import_status/")
-                if resp.text.find("4") >= 0 or resp.text.find("0") >= 0:
-                    break
-                time.sleep(0.1)
-            if resp.text.find("4") >= 0:
-                events.request_success.fire(request_type="http",
-                                            name="course_import",
-                                            response_time=(time.time() - start_time) * 1000,
-                                            response_length=0)
-            else:
-                events.request_failure.fire(request_type="http",
-                                            name="course_import",
-                                            response_time=(time.time() - start_time) * 1000)
+                return False
+        return True
+
+    def get_import_status(self, cid, ifname):
+        """
+        Return the ImportStatus of an import, or None if it can't be read.
+        """
+        resp = self.client.get("/import_status/{0}/{1}".format(cid, ifname),
+                               name="/import_status/")
+        try:
+            return int(resp.json()['ImportStatus'])
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def wait_for_import(self, cid, ifname):
+        """
+        Poll the status of an import, backing off, until it succeeds, fails,
+        its status is lost, or it times out.
+
+        Returns:
+            The last ImportStatus read, and the list of (status, time)
+            transitions seen.
+        """
+        deadline = time.time() + IMPORT_TIMEOUT
+        interval = IMPORT_STATUS_INTERVAL
+        transitions = []
+        while True:
+            status = self.get_import_status(cid, ifname)
+            if status is not None and (not transitions or transitions[-1][0] != status):
+                transitions.append((status, time.time()))
+                interval = IMPORT_STATUS_INTERVAL
+            if import_timeline.import_ended(transitions):
+                return status, transitions
+            if time.time() + interval > deadline:
+                return status, transitions
+            time.sleep(interval)
+            interval = min(interval * 2, IMPORT_STATUS_MAX_INTERVAL)
+
+    def import_course(self, num):
+        """
+        Import a course over run number 'num'.
+
+        The time taken to upload the tarball, to process the import, and the
+        total time, are reported as course_import:upload,
+        course_import:processing and course_import.  The time spent in each
+        stage of the processing is reported as course_import:stage:<stage>.
+        """
+
+        cid = "course-v1:LocustX+Soup101+X{0:02d}".format(num)
+        import_url = "/import/{0}".format(cid)
+        ifname = "some{0:08d}.tar.gz".format(int(random.random() * 1e8))
+        self.client.get(import_url, name="/import")
+
+        start_time = time.time()
+        uploaded = self.upload_course(import_url, ifname)
+        upload_time = time.time()
+        _fire_import_event("course_import:upload", start_time, upload_time, uploaded,
+                           Exception('Course upload failed.'))
+        if not uploaded:
+            _fire_import_event("course_import", start_time, upload_time, False,
+                               Exception('Course upload failed.'))
+            return
+
+        status, transitions = self.wait_for_import(cid, ifname)
+        end_time = time.time()
+        success = status == IMPORT_STATUS_SUCCESS
+        if import_timeline.status_lost(transitions):
+            exception = Exception('Course import status was lost.')
+        else:
+            exception = Exception('Course import ended with status {0}.'.format(status))
+
+        durations = import_timeline.stage_durations(transitions, end_time)
+        for stage, duration, stage_success in durations:
+            _fire_import_event("course_import:stage:{0}".format(stage), 0, duration, stage_success,
+                               Exception('Course import failed while {0}.'.format(stage)))
+        import_timeline.log_stage_durations(durations)
+
+        _fire_import_event("course_import:processing", upload_time, end_time, success, exception)
+        _fire_import_event("course_import", start_time, end_time, success, exception)
 
     @task
     def import_random_course(self):
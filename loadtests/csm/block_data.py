@@ -0,0 +1,137 @@
+"""
+Generates the state of StudentModules, with the sizes seen in production.
+
+csm-sizes.csv is the distribution of the length of the serialized state of the
+rows of courseware_studentmodule: each line gives a number of rows, and the
+length of their state.
+
+Random numbers are drawn from numpy in batches of SAMPLE_BATCH_SIZE, which are
+then handed out one at a time by a BatchSampler, so that the load generator
+spends as little CPU as possible per operation.
+"""
+import bisect
+import csv
+import os
+import string
+
+import numpy
+
+# The number of values drawn at once by a BatchSampler.
+SAMPLE_BATCH_SIZE = 10000
+
+with open(os.path.join(os.path.dirname(__file__), 'csm-sizes.csv')) as sizes:
+    reader = csv.reader(sizes)
+    reader.next()  # Drop the header row
+    CSM_SIZES = []
+    CSM_COUNT = 0
+    for count, length in reader:
+        CSM_COUNT += int(count)
+        CSM_SIZES.append((CSM_COUNT, int(length)))
+
+_CUMULATIVE_COUNTS = numpy.array([count for count, __ in CSM_SIZES])
+_LENGTHS = numpy.array([length for __, length in CSM_SIZES])
+
+# Block state values are slices of this string, which is long enough for a
+# single field to hold the largest state.
+_ALPHABET = numpy.array(list(string.ascii_letters + string.digits))
+RANDOM_CHARACTERS = _ALPHABET[numpy.random.randint(0, len(_ALPHABET), _LENGTHS.max())].tostring()
+
+
+class BatchSampler(object):
+    """
+    Hands out random values one at a time, from batches drawn by
+    draw(batch_size), which returns a numpy array.
+    """
+
+    def __init__(self, draw, batch_size=SAMPLE_BATCH_SIZE):
+        self.draw = draw
+        self.batch_size = batch_size
+        self._batch = []
+        self._index = 0
+
+    def reset(self, draw=None):
+        """
+        Drop the values drawn so far, e.g. after changing the distribution.
+        """
+        if draw is not None:
+            self.draw = draw
+        self._batch = []
+        self._index = 0
+
+    def next(self):
+        if self._index >= len(self._batch):
+            # tolist() turns the numpy scalars into python ones up front.
+            self._batch = self.draw(self.batch_size).tolist()
+            self._index = 0
+        value = self._batch[self._index]
+        self._index += 1
+        return value
+
+
+def draw_block_sizes(count):
+    """
+    Return an array of the lengths of the serialized state of count random
+    StudentModules.
+    """
+    return _LENGTHS[numpy.searchsorted(_CUMULATIVE_COUNTS, numpy.random.randint(0, CSM_COUNT + 1, count))]
+
+
+BLOCK_SIZES = BatchSampler(draw_block_sizes)
+
+
+def random_block_size():
+    """
+    Return the length of the serialized state of a random StudentModule.
+    """
+    return BLOCK_SIZES.next()
+
+
+def block_data(target_serialized_size, num_fields):
+    """
+    Return the state of a block, which serializes to json in about
+    target_serialized_size characters.
+    """
+    if target_serialized_size == 2:
+        return {}
+    else:
+        # A serialized field looks like: `"key": "value",`.
+        # We'll use a standard set of single characters for keys (so that
+        # our data overlaps). So, we need 1 char for the key, 6 for the syntax,
+        # and the rest goes to the value.
+        data_per_field = max(target_serialized_size // num_fields - 6, 0)
+        # All the fields share the same value, cut once.
+        value = RANDOM_CHARACTERS[:data_per_field]
+        return {str(field): value for field in range(num_fields)}
+
+
+# Upper bounds of the size classes of block states, in bytes.
+SIZE_CLASSES = (64, 256, 1024, 4096, 16384, 65536)
+
+
+def _format_bytes(size):
+    if size >= 1024:
+        return '{}KB'.format(size // 1024)
+    return '{}B'.format(size)
+
+
+def size_class(size):
+    """
+    Return the label of the size class of a block state of size bytes, e.g.
+    "<=1KB".
+    """
+    i = bisect.bisect_left(SIZE_CLASSES, size)
+    if i == len(SIZE_CLASSES):
+        return '>{}'.format(_format_bytes(SIZE_CLASSES[-1]))
+    return '<={}'.format(_format_bytes(SIZE_CLASSES[i]))
+
+
+def block_count_class(count):
+    """
+    Return the label of the class of a number of blocks, e.g. "5-8 blocks".
+    Classes double in size, so that latency can be compared across orders of
+    magnitude.
+    """
+    if count < 3:
+        return '{} block{}'.format(count, '' if count == 1 else 's')
+    upper = 1 << (count - 1).bit_length()
+    return '{}-{} blocks'.format(upper // 2 + 1, upper)
@@ -0,0 +1,128 @@
+"""
+A bounded pool of database connections, shared by the locusts of a process.
+
+Out of the box, Django keeps one connection per thread.  Under locust every
+locust is a greenlet of the same thread, so they would all share a single
+connection, which is why the CSM tasks close the connection after every task,
+and why every task pays for a new connection.  With the C MySQLdb driver, each
+query also blocks the whole process, so only one greenlet talks to the database
+at a time.
+
+This pool instead:
+
+* makes Django look connections up per greenlet rather than per thread,
+* hands each task one of at most `size` DatabaseWrappers, which are kept open
+  and reused by the following tasks.
+
+It should be used along with a cooperative driver (PyMySQL, running over the
+sockets monkey patched by locust), so that greenlets waiting on the database
+let others run:
+
+    import pymysql
+    pymysql.install_as_MySQLdb()
+    ...
+    pool = ConnectionPool(size=20)
+    with pool.connection():
+        StudentModule.objects.filter(...)
+"""
+from contextlib import contextmanager
+
+from django.db import connections, DEFAULT_DB_ALIAS
+from django.db.utils import load_backend
+from gevent.local import local
+from gevent.queue import LifoQueue
+
+
+class ConnectionPool(object):
+    """
+    A bounded pool of Django DatabaseWrappers for one database alias.
+    """
+
+    def __init__(self, size, alias=DEFAULT_DB_ALIAS):
+        self.size = size
+        self.alias = alias
+        # Last in, first out, so that the connections used most recently (and
+        # most likely to still be open) are reused first.
+        self._idle = LifoQueue(size)
+        self._created = 0
+        # Bumped by recycle(): connections of an older generation are closed
+        # when released.
+        self._generation = 0
+
+        # Make django.db.connection refer to the connection of the current
+        # greenlet, rather than to the one of the current thread.
+        connections._connections = local()
+
+    def _create(self):
+        settings_dict = connections.databases[self.alias]
+        backend = load_backend(settings_dict['ENGINE'])
+        wrapper = backend.DatabaseWrapper(settings_dict, self.alias)
+        wrapper.pool_generation = self._generation
+        return wrapper
+
+    def _current(self):
+        return getattr(connections._connections, self.alias, None)
+
+    def acquire(self):
+        """
+        Return an idle connection, creating one if fewer than size exist, or
+        else waiting for one to be released.  It becomes the connection of the
+        current greenlet.
+        """
+        if self._idle.empty() and self._created < self.size:
+            self._created += 1
+            wrapper = self._create()
+        else:
+            wrapper = self._idle.get()
+        setattr(connections._connections, self.alias, wrapper)
+        return wrapper
+
+    def release(self, wrapper, discard=False):
+        """
+        Return a connection to the pool.  If discard is True, e.g. because a
+        query failed, or if the pool was recycled while it was in use, the
+        database connection is closed first, to be reopened by the next task
+        using it.
+        """
+        if self._current() is wrapper:
+            delattr(connections._connections, self.alias)
+        if discard or wrapper.pool_generation != self._generation:
+            wrapper.close()
+            wrapper.pool_generation = self._generation
+        self._idle.put(wrapper)
+
+    def recycle(self):
+        """
+        Close every connection, e.g. after the database settings changed, so
+        that they reconnect with the new settings: the idle ones right away,
+        and those in use once they are released.
+        """
+        self._generation += 1
+        idle = []
+        while not self._idle.empty():
+            idle.append(self._idle.get_nowait())
+        for wrapper in idle:
+            wrapper.close()
+            wrapper.pool_generation = self._generation
+            self._idle.put(wrapper)
+
+    @contextmanager
+    def connection(self):
+        """
+        Hold a connection for the duration of the block.
+
+        Nested blocks in the same greenlet reuse the connection of the
+        outermost one.
+        """
+        if self._current() is not None:
+            yield self._current()
+            return
+
+        wrapper = self.acquire()
+        try:
+            yield wrapper
+        except Exception:
+            self.release(wrapper, discard=True)
+            raise
+        else:
+            self.release(wrapper)
@@ -0,0 +1,143 @@
+"""
+The CSM backend using edx-platform's DjangoXBlockUserStateClient, against the
+MySQL database configured by the DB_* settings.
+
+Importing this module sets up Django with csm.locustsettings, which requires
+edx-platform (see platform-requirements.txt).
+"""
+import functools
+import json
+import os
+from warnings import filterwarnings
+
+from helpers import settings
+
+settings.Settings(data=settings.data, secrets=settings.secrets).validate_required(required_data=[
+    'DB_ENGINE',
+    'DB_HOST',
+    'DB_NAME',
+    'DB_PORT',
+    'DB_USER',
+    'DB_PASSWORD',
+])
+
+# With DB_POOL_SIZE set, locusts share a bounded pool of connections which are
+# kept open across tasks, and MySQLdb is replaced by PyMySQL, which runs over
+# the sockets locust has already monkey patched for gevent.  Otherwise, every
+# task opens a new connection with the (blocking) MySQLdb driver.
+DB_POOL_SIZE = settings.data.get('DB_POOL_SIZE')
+if DB_POOL_SIZE:
+    import pymysql
+    pymysql.install_as_MySQLdb()
+
+import MySQLdb as Database  # noqa
+
+os.environ["DJANGO_SETTINGS_MODULE"] = "csm.locustsettings"
+# Load django settings here to trigger edx-platform sys.path manipulations
+from django.conf import settings as django_settings  # noqa
+django_settings.INSTALLED_APPS
+
+import courseware.user_state_client as user_state_client  # noqa
+from courseware.models import StudentModule  # noqa
+from django.contrib.auth.models import User  # noqa
+from student.tests.factories import UserFactory  # noqa
+from django.db import transaction, connection  # noqa
+from csm.connection_pool import ConnectionPool  # noqa
+
+# Without this, the greenlets will halt for database warnings
+filterwarnings('ignore', category=Database.Warning)
+
+CONNECTION_POOL = ConnectionPool(DB_POOL_SIZE) if DB_POOL_SIZE else None
+
+
+def with_connection(func):
+    """
+    Run func with a connection from CONNECTION_POOL, or else close the
+    connection of this process after it.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if CONNECTION_POOL is not None:
+            with CONNECTION_POOL.connection():
+                return func(*args, **kwargs)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            connection.close()
+    return wrapper
+
+
+def transactional(func):
+    """
+    Run a task in a database transaction, committed once the task is done.
+    """
+    @functools.wraps(func)
+    @with_connection
+    @transaction.commit_manually
+    def wrapper(*args, **kwargs):
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            transaction.rollback()
+            raise
+        transaction.commit()
+        return result
+    return wrapper
+
+
+class LoadTestUserStateClient(user_state_client.DjangoXBlockUserStateClient):
+    """
+    DjangoXBlockUserStateClient, which can also create the state of many new
+    blocks at once.
+    """
+
+    def bulk_create(self, username, block_keys_to_state):
+        """
+        Create the StudentModules of blocks which have none yet, in a single
+        multi-row INSERT, and return True.
+        """
+        user = self.user if self.user.username == username else User.objects.get(username=username)
+        StudentModule.objects.bulk_create([
+            StudentModule(
+                student=user,
+                course_id=usage_key.course_key,
+                module_state_key=usage_key,
+                module_type=usage_key.block_type,
+                state=json.dumps(state),
+            )
+            for usage_key, state in block_keys_to_state.iteritems()
+        ])
+        return True
+
+
+def create_client():
+    """
+    Return a LoadTestUserStateClient for a new user.
+    """
+    return LoadTestUserStateClient(with_connection(UserFactory.create)())
+
+
+# The database parameters which can be changed during a run, from /set_params.
+DATABASE_PARAMS = ('USER', 'PASSWORD', 'PORT', 'NAME', 'HOST')
+
+
+def database_params():
+    """
+    Return the current database parameters, without the password.
+    """
+    database = django_settings.DATABASES['default']
+    return {key: database.get(key, '') for key in DATABASE_PARAMS if key != 'PASSWORD'}
+
+
+def set_database_params(params):
+    """
+    Change the database parameters for the rest of the run.
+
+    The settings dict is updated in place, at once, since the DatabaseWrappers
+    of all connections share it.  Pooled connections are then recycled, so that
+    they reconnect with the new parameters; without a pool, every task opens a
+    new connection anyway.
+    """
+    django_settings.DATABASES['default'].update(params)
+    if CONNECTION_POOL is not None:
+        CONNECTION_POOL.recycle()
@@ -7,68 +7,77 @@ import sys
 # due to locust sys.path manipulation, we need to re-add the project root.
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-# from gevent import monkey
-# monkey.patch_all()
-
-
-# import pymysql
-# Monkeypatch MySQLdb to a gevent-compatible library
-# pymysql.install_as_MySQLdb()
-
-import bisect
-import csv
+from collections import defaultdict
+import json
 import logging
 import numpy
 import random
-import string
 import time
 import types
 
-from locust import Locust, TaskSet, task, events, web
-from locust.exception import LocustError
+from locust import Locust, TaskSet, task, events, runners, web
+from locust.runners import MasterLocustRunner
 
-from warnings import filterwarnings
-import MySQLdb as Database
-
-from helpers.raw_logs import RawLogger
-from helpers import datadog_reporting, settings, markers
+from helpers import settings
 
 # load the test settings BEFORE django settings where they are used for
 # database configuration
-settings.init(__name__, required_data=[
-    'DB_ENGINE',
-    'DB_HOST',
-    'DB_NAME',
-    'DB_PORT',
-    'DB_USER',
-    'DB_PASSWORD',
-])
+settings.init(__name__)
+
+from helpers.raw_logs import RawLogger  # noqa
+from helpers import datadog_reporting, markers  # noqa
 
 markers.install_event_markers()
 
-os.environ["DJANGO_SETTINGS_MODULE"] = "csm.locustsettings"
-# Load django settings here to trigger edx-platform sys.path manipulations
-from django.conf import settings as django_settings  # noqa
-django_settings.INSTALLED_APPS
+# The user state client under test: "django" (the default) uses edx-platform's
+# DjangoXBlockUserStateClient against MySQL, and "sqlite" uses a stand-in
+# storing the same rows in SQLite, which needs neither MySQL nor edx-platform.
+CSM_BACKEND = settings.data.get('CSM_BACKEND', 'django')
+if CSM_BACKEND == 'sqlite':
+    from csm import sqlite_backend as backend  # noqa
+else:
+    from csm import django_backend as backend  # noqa
 
-import courseware.user_state_client as user_state_client  # noqa
-from student.tests.factories import UserFactory  # noqa
 from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator  # noqa
+from csm.block_data import BatchSampler, block_count_class, block_data, random_block_size, size_class  # noqa
 
 LOG = logging.getLogger(__file__)
-RANDOM_CHARACTERS = [random.choice(string.ascii_letters + string.digits) for __ in xrange(1000)]
 
-from django.db import transaction, connection  # noqa
+# The shape of the Pareto distribution of the number of blocks requested at
+# once, which is limited to MAX_BLOCKS to remove large numbers that happen over
+# time.  We've also seen at most MAX_BLOCKS blocks requested in a course, so
+# usage keys are generated with at most that many different indexes.
+PARETO_A = settings.data.get('CSM_PARETO_A', 2.21)
+MAX_BLOCKS = 1000
+
+# Instead of picking from a distribution that will continually increase the
+# number of fields per block, all blocks have the same number of fields.
+FIELD_COUNT = settings.data.get('CSM_FIELD_COUNT', 3)
 
-with open(os.path.join(os.path.dirname(__file__), 'csm-sizes.csv')) as sizes:
-    reader = csv.reader(sizes)
-    reader.next()  # Drop the header row
-    CSM_SIZES = []
-    CSM_COUNT = 0
-    for count, length in reader:
-        CSM_COUNT += int(count)
-        CSM_SIZES.append((CSM_COUNT, int(length)))
 
+def draw_num_blocks(count):
+    "Return an array of count random numbers of blocks requested at once."
+    return numpy.minimum((numpy.random.pareto(PARETO_A, count) + 1).astype(int), MAX_BLOCKS)
+
+
+NUM_BLOCKS = BatchSampler(draw_num_blocks)
+BLOCK_INDEXES = BatchSampler(lambda count: numpy.random.randint(0, MAX_BLOCKS, count))
+
+
+def set_load_model_params(pareto_a, field_count):
+    """
+    Change the parameters of the load model for the rest of the run.
+    """
+    global PARETO_A, FIELD_COUNT  # pylint: disable=global-statement
+    PARETO_A = pareto_a
+    FIELD_COUNT = field_count
+    # Drop the block counts drawn with the previous PARETO_A.
+    NUM_BLOCKS.reset()
+
+
+# When populating the blocks of a user, blocks of the same size class are
+# created together, in writes of at most this many bytes of state.
+POPULATE_WRITE_SIZE = 1000000
 
 # TODO: This won't work well if we want to import this file
 # from some other test. For that to work, locust would need
@@ -79,18 +88,19 @@ datadog_reporting.setup()
 
 
 class UserStateClient(object):
-    '''A wrapper class around DjangoXBlockUserStateClient. This does
-    two things that the original class does not do:
+    '''A wrapper class around the user state client of the backend
+    (e.g. DjangoXBlockUserStateClient). This does two things that the
+    original class does not do:
     * It reports statistics meaningfully to Locust.
     * It provides convenience methods for load-testing (at the moment,
       this is only a method "username" which returns the username
       associated with the client instance).
     '''
 
-    def __init__(self, user):
-        '''Constructor. The argument 'user' is passed to the
-        DjangoXBlockUserStateClient constructor.'''
-        self._client = user_state_client.DjangoXBlockUserStateClient(user)
+    def __init__(self, client):
+        '''Constructor. The argument 'client' is the user state client
+        to wrap.'''
+        self._client = client
 
     @property
     def username(self):
@@ -98,10 +108,26 @@ class UserStateClient(object):
         return self._client.user.username
 
     def __getattr__(self, name):
-        "Wraps around client methods and reports stats to locust."
+        """
+        Wraps around client methods and reports stats to locust.
+
+        Calls of methods taking the blocks to read or write (get_many,
+        set_many) are reported by the number of blocks, e.g. as
+        "get_many 5-8 blocks", with the bytes of state read or written as the
+        response length.
+        """
+        return self.named(name, name, by_block_count=True)
+
+    def named(self, stat_name, name, by_block_count=False):
+        "Wraps around the client method 'name', reporting stats to locust as 'stat_name'."
         func = getattr(self._client, name)
 
         def wrapper(*args, **kwargs):
+            blocks = _blocks_argument(args, kwargs)
+            request_name = stat_name
+            if by_block_count and blocks is not None:
+                request_name = '{} {}'.format(stat_name, block_count_class(len(blocks)))
+
             start_time = time.time()
             try:
                 result = func(*args, **kwargs)
@@ -114,7 +140,7 @@ class UserStateClient(object):
                 LOG.warning("Request Failed", exc_info=True)
                 events.request_failure.fire(
                     request_type="DjangoXBlockUserStateClient",
-                    name=name,
+                    name=request_name,
                     response_time=total_time,
                     start_time=start_time,
                     end_time=end_time,
@@ -125,16 +151,52 @@ class UserStateClient(object):
                 total_time = (end_time - start_time) * 1000
                 events.request_success.fire(
                     request_type="DjangoXBlockUserStateClient",
-                    name=name,
+                    name=request_name,
                     response_time=total_time,
                     start_time=start_time,
                     end_time=time.time(),
-                    response_length=0
+                    response_length=_payload_length(blocks, result)
                 )
                 return result
         return wrapper
 
 
+def _blocks_argument(args, kwargs):
+    """
+    Return the block keys (or the mapping of block keys to state) passed to a
+    client method, or None if it takes none.
+    """
+    if len(args) > 1:
+        return args[1]
+    return kwargs.get('block_keys', kwargs.get('block_keys_to_state'))
+
+
+def _state_length(state):
+    """
+    Return the length of the serialized state of a block, estimated the same
+    way as block_data() sizes it: each field takes the length of its key and
+    value, plus 6 characters of json syntax.  This is much cheaper than
+    serializing the state again.
+    """
+    return 2 + sum(
+        len(key) + (len(value) if isinstance(value, basestring) else len(str(value))) + 6
+        for key, value in state.iteritems()
+    )
+
+
+def _payload_length(blocks, result):
+    """
+    Return the length of the serialized state written (blocks is a mapping of
+    block keys to state) or read (result is a list of XBlockUserState) by a
+    client method.
+    """
+    if isinstance(blocks, dict):
+        return sum(_state_length(state) for state in blocks.itervalues())
+    if isinstance(result, list):
+        return sum(_state_length(user_state.state) for user_state in result)
+    return 0
+
+
 class CSMLoadModel(TaskSet):
     """
     Generate load for courseware.StudentModule using the model defined here:
@@ -147,74 +209,94 @@ class CSMLoadModel(TaskSet):
         self.usages_with_data = set()
 
     def _gen_field_count(self):
-        # Instead of picking from a distribution that will continually increase the number of fields per block,
-        # just make all blocks have three fields for now.
-        return 3
+        return FIELD_COUNT
 
     def _gen_block_type(self):
         return random.choice(['problem', 'html', 'sequence', 'vertical'])
 
     def _gen_block_size(self):
-        i = bisect.bisect(CSM_SIZES, (random.randint(0, CSM_COUNT), 0))
-        return CSM_SIZES[i][1]
+        return random_block_size()
 
     def _gen_block_data(self):
-        target_serialized_size = self._gen_block_size()
-        num_fields = self._gen_field_count()
-
-        if target_serialized_size == 2:
-            return {}
-        else:
-            # A serialized field looks like: `"key": "value",`.
-            # We'll use a standard set of single characters for keys (so that
-            # our data overlaps). So, we need 1 char for the key, 6 for the syntax,
-            # and the rest goes to the value.
-            data_per_field = max(target_serialized_size // num_fields - 6, 0)
-            return {
-                str(field): (RANDOM_CHARACTERS * (data_per_field // 1000 + 1))[:data_per_field]
-                for field in range(num_fields)
-            }
+        return block_data(self._gen_block_size(), self._gen_field_count())
 
     def _gen_num_blocks(self):
-        # Limit the Pareto distribution to remove large numbers that happen over time.
-        return min(int(numpy.random.pareto(a=2.21) + 1), 1000)
+        return NUM_BLOCKS.next()
 
     def _gen_usage_key(self):
         return BlockUsageLocator(
             self.course_key,
             self._gen_block_type(),
-            # We've seen at most 1000 blocks requested in a course, so we'll
-            # generate at most that many different indexes.
-            str(numpy.random.randint(0, 1000)),
+            str(BLOCK_INDEXES.next()),
         )
 
+    def _gen_new_usage_keys(self, count):
+        usage_keys = set()
+        while len(usage_keys) < count:
+            usage_key = self._gen_usage_key()
+            if usage_key not in self.usages_with_data:
+                usage_keys.add(usage_key)
+        return usage_keys
+
+    def populate(self, block_count):
+        """
+        Create the state of block_count new blocks for this user, in a few
+        multi-row writes of blocks of the same size class.
+
+        The writes are reported as "populate <size class>", apart from the
+        steady state get_many and set_many.  This runs in the transaction of
+        the task calling it.
+        """
+        by_size_class = defaultdict(list)
+        for usage_key in self._gen_new_usage_keys(block_count):
+            size = self._gen_block_size()
+            by_size_class[size_class(size)].append((usage_key, size))
+
+        for label, blocks in by_size_class.iteritems():
+            bulk_create = self.client.named('populate {}'.format(label), 'bulk_create')
+            states = {}
+            write_size = 0
+            for usage_key, size in blocks:
+                states[usage_key] = block_data(size, self._gen_field_count())
+                write_size += size
+                if write_size >= POPULATE_WRITE_SIZE:
+                    self._bulk_create(bulk_create, states)
+                    states = {}
+                    write_size = 0
+            if states:
+                self._bulk_create(bulk_create, states)
+
+    def _bulk_create(self, bulk_create, states):
+        # The client wrapper reports failures to locust and returns None, so
+        # only keep track of the blocks which were actually written.
+        if bulk_create(self.client.username, states):
+            self.usages_with_data.update(states)
+
     @task(1)
-    @transaction.commit_manually
+    @backend.transactional
     def get_many(self):
         block_count = self._gen_num_blocks()
         if block_count > len(self.usages_with_data):
             # Create the number of blocks up to block_count.
-            for __ in xrange(block_count - len(self.usages_with_data)):
-                self.set_many()
-        else:
-            # TODO: This doesn't accurately represent queries which would retrieve
-            # data from StudentModules with no state, or usages with no StudentModules
-            self.client.get_many(
-                self.client.username,
-                random.sample(self.usages_with_data, block_count)
-            )
-        transaction.commit()
-        connection.close()
+            self.populate(block_count - len(self.usages_with_data))
+            # Some of the writes may have failed.
+            block_count = min(block_count, len(self.usages_with_data))
+            if not block_count:
+                return
+        # TODO: This doesn't accurately represent queries which would retrieve
+        # data from StudentModules with no state, or usages with no StudentModules
+        self.client.get_many(
+            self.client.username,
+            random.sample(self.usages_with_data, block_count)
+        )
 
     @task(1)
-    @transaction.commit_manually
+    @backend.transactional
     def set_many(self):
         usage_key = self._gen_usage_key()
         self.client.get_many(self.client.username, [usage_key])
         self.client.set_many(self.client.username, {usage_key: self._gen_block_data()})
         self.usages_with_data.add(usage_key)
-        transaction.commit()
-        connection.close()
 
 
 class UserStateClientClient(Locust):
@@ -225,14 +307,12 @@ class UserStateClientClient(Locust):
     max_wait = 1
 
     def __init__(self):
-        '''Constructor. DATABASE environment variables must be set
-        (via locustsetting.py) prior to constructing this object.'''
+        '''Constructor. For the django backend, DATABASE environment
+        variables must be set (via locustsetting.py) prior to constructing
+        this object.'''
         super(UserStateClientClient, self).__init__()
 
-        # Without this, the greenlets will halt for database warnings
-        filterwarnings('ignore', category=Database.Warning)
-
-        self.client = UserStateClient(user=UserFactory.create())
+        self.client = UserStateClient(backend.create_client())
 
 
 # Help the template loader find our template.
@@ -240,15 +320,56 @@ web.app.jinja_loader.searchpath.append(
     os.path.join(os.path.dirname(__file__), 'templates'))
 
 
+def _parse_load_model_params(form):
+    """
+    Return the (pareto_a, field_count) posted to /set_params, raising
+    ValueError if they are invalid.
+    """
+    pareto_a = float(form['PARETO_A'])
+    field_count = int(form['FIELD_COUNT'])
+    if pareto_a <= 0:
+        raise ValueError('The Pareto a must be positive.')
+    if field_count < 1:
+        raise ValueError('Blocks need at least one field.')
+    return pareto_a, field_count
+
+
 @web.app.route("/set_params", methods=['GET', 'POST'])
 def set_params():
-    '''Convenience method; creates a page (via flask) for setting
-    database parameters when locust's web interface is enabled.'''
-    if web.request.method == 'POST':
-        if len(web.request.form['PASSWORD']) > 0:
-            django_settings.DATABASES['default']['PASSWORD'] \
-                = web.request.form['PASSWORD']
-        for key in ['USER', 'PORT', 'NAME', 'HOST']:
-            django_settings.DATABASES['default'][key] = web.request.form[key]
+    '''Convenience method; creates a page (via flask) for changing the
+    database parameters and the load model while the test is running, when
+    locust's web interface is enabled.
+
+    The parameters are validated, then all applied at once, and logged as a
+    "set_params" event marker, so that the stats of each setting can be told
+    apart within a single run.
+
+    This only works when locust runs on its own: a master has no way of
+    passing the parameters on to its slaves, which run the locusts, so it
+    refuses to change them.'''
+    error = None
+    if web.request.method == 'POST' and isinstance(runners.locust_runner, MasterLocustRunner):
+        error = ('This is a master, which cannot pass parameters on to its slaves. '
+                 'Restart the slaves with new settings instead.')
+    elif web.request.method == 'POST':
+        try:
+            pareto_a, field_count = _parse_load_model_params(web.request.form)
+        except ValueError as exc:
+            error = exc
+        else:
+            database_params = {
+                key: web.request.form[key]
+                for key in backend.DATABASE_PARAMS
+                # Leave the password unchanged unless a new one was entered.
+                if key != 'PASSWORD' or len(web.request.form[key]) > 0
+            }
+            backend.set_database_params(database_params)
+            set_load_model_params(pareto_a, field_count)
+
+            logged_params = dict(backend.database_params(), PARETO_A=pareto_a, FIELD_COUNT=field_count)
+            markers.EventMarker('set_params {}'.format(json.dumps(logged_params, sort_keys=True)))()
     return web.render_template('set_params.html',
-                               **django_settings.DATABASES['default'])
+                               database=backend.database_params(),
+                               PARETO_A=PARETO_A,
+                               FIELD_COUNT=FIELD_COUNT,
+                               error=error)
@@ -0,0 +1,253 @@
+"""
+A CSM backend storing user state in SQLite, for running the CSM load test
+without MySQL or edx-platform.
+
+SQLiteUserStateClient stands in for edx-platform's DjangoXBlockUserStateClient:
+it uses the same courseware_studentmodule schema, makes the same queries, and
+serializes state to json the same way, so that the load model, the client
+wrapper and the cost of (de)serializing blocks of each size can be measured on
+any machine.
+
+Settings:
+
+    CSM_SQLITE_DB: the database file (default: an in-memory database).
+    CSM_SQLITE_SEED_ROWS: how many rows to fill courseware_studentmodule with
+        before the test starts, with state sizes following csm-sizes.csv
+        (default: 0).
+"""
+from collections import namedtuple
+import datetime
+import functools
+import itertools
+import json
+from operator import attrgetter
+import sqlite3
+import uuid
+
+from helpers import settings
+from csm.block_data import block_data, random_block_size
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS auth_user (
+    id integer NOT NULL PRIMARY KEY AUTOINCREMENT,
+    username varchar(30) NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS courseware_studentmodule (
+    id integer NOT NULL PRIMARY KEY AUTOINCREMENT,
+    module_type varchar(32) NOT NULL,
+    module_id varchar(255) NOT NULL,
+    student_id integer NOT NULL REFERENCES auth_user (id),
+    state text,
+    grade real,
+    created datetime NOT NULL,
+    modified datetime NOT NULL,
+    max_grade real,
+    done varchar(8) NOT NULL,
+    course_id varchar(255) NOT NULL,
+    UNIQUE (student_id, module_id, course_id)
+);
+CREATE INDEX IF NOT EXISTS courseware_studentmodule_module_type ON courseware_studentmodule (module_type);
+CREATE INDEX IF NOT EXISTS courseware_studentmodule_module_id ON courseware_studentmodule (module_id);
+CREATE INDEX IF NOT EXISTS courseware_studentmodule_student_id ON courseware_studentmodule (student_id);
+CREATE INDEX IF NOT EXISTS courseware_studentmodule_grade ON courseware_studentmodule (grade);
+CREATE INDEX IF NOT EXISTS courseware_studentmodule_created ON courseware_studentmodule (created);
+CREATE INDEX IF NOT EXISTS courseware_studentmodule_modified ON courseware_studentmodule (modified);
+CREATE INDEX IF NOT EXISTS courseware_studentmodule_done ON courseware_studentmodule (done);
+CREATE INDEX IF NOT EXISTS courseware_studentmodule_course_id ON courseware_studentmodule (course_id);
+'''
+
+# StudentModule.objects.chunked_filter queries this many usage keys at once.
+QUERY_CHUNK_SIZE = 500
+
+# The fields of the state of a seeded row.
+SEED_FIELD_COUNT = 3
+
+User = namedtuple('User', ['id', 'username'])
+
+# The same fields as edx-user-state-client's XBlockUserState.
+XBlockUserState = namedtuple('XBlockUserState', ['username', 'block_key', 'state', 'updated', 'scope'])
+
+# The database shared by all locusts of this process.
+_database = None
+
+
+class SQLiteDatabase(object):
+    """
+    A SQLite database with the tables used by the user state client.
+    """
+
+    def __init__(self, path=':memory:'):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+        self.connection.commit()
+
+    def create_user(self, username=None):
+        username = username or 'csm_{}'.format(uuid.uuid4().hex[:20])
+        cursor = self.connection.execute('INSERT INTO auth_user (username) VALUES (?)', (username,))
+        self.connection.commit()
+        return User(cursor.lastrowid, username)
+
+    def seed(self, rows, course_id='course-v1:seed+seed+seed', rows_per_user=100):
+        """
+        Fill courseware_studentmodule with rows of other users, with state
+        sizes following csm-sizes.csv.
+        """
+        now = datetime.datetime.utcnow()
+        for start in xrange(0, rows, rows_per_user):
+            user = self.create_user()
+            self.connection.executemany(
+                'INSERT INTO courseware_studentmodule '
+                '(module_type, module_id, student_id, state, created, modified, done, course_id) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    ('problem', 'block-v1:seed+seed+seed+type@problem+block@{}'.format(index), user.id,
+                     json.dumps(block_data(random_block_size(), SEED_FIELD_COUNT)), now, now, 'na', course_id)
+                    for index in xrange(min(rows_per_user, rows - start))
+                )
+            )
+        self.connection.commit()
+
+
+def get_database():
+    """
+    Return the SQLiteDatabase shared by all locusts in this process, creating
+    and seeding it the first time.
+    """
+    global _database  # pylint: disable=global-statement
+    if _database is None:
+        _database = SQLiteDatabase(settings.data.get('CSM_SQLITE_DB', ':memory:'))
+        _database.seed(settings.data.get('CSM_SQLITE_SEED_ROWS', 0))
+    return _database
+
+
+class SQLiteUserStateClient(object):
+    """
+    A stand-in for DjangoXBlockUserStateClient, storing state in a
+    SQLiteDatabase.
+
+    Only the user_state scope is supported, so the scope arguments are ignored.
+    """
+
+    def __init__(self, database, user):
+        self.database = database
+        self.user = user
+
+    def _user_id(self, username):
+        if username == self.user.username:
+            return self.user.id
+        row = self.database.connection.execute('SELECT id FROM auth_user WHERE username = ?', (username,)).fetchone()
+        return row[0]
+
+    def _get_student_modules(self, username, block_keys):
+        """
+        Yield (block_key, (state, modified)) for the blocks of username which
+        have a StudentModule, querying each course in chunks as
+        StudentModule.objects.chunked_filter does.
+        """
+        course_key_func = attrgetter('course_key')
+        by_course = itertools.groupby(sorted(block_keys, key=course_key_func), course_key_func)
+        for course_key, usage_keys in by_course:
+            keys_by_id = {unicode(usage_key): usage_key for usage_key in usage_keys}
+            module_ids = list(keys_by_id)
+            for start in xrange(0, len(module_ids), QUERY_CHUNK_SIZE):
+                chunk = module_ids[start:start + QUERY_CHUNK_SIZE]
+                rows = self.database.connection.execute(
+                    'SELECT sm.module_id, sm.state, sm.modified FROM courseware_studentmodule sm '
+                    'INNER JOIN auth_user u ON sm.student_id = u.id '
+                    'WHERE sm.course_id = ? AND u.username = ? AND sm.module_id IN ({})'.format(
+                        ', '.join('?' * len(chunk))
+                    ),
+                    [unicode(course_key), username] + chunk,
+                )
+                for module_id, state, modified in rows:
+                    yield keys_by_id[module_id], (state, modified)
+
+    def get_many(self, username, block_keys, scope=None, fields=None):
+        for block_key, (state, modified) in self._get_student_modules(username, block_keys):
+            state = json.loads(state)
+            if fields is not None:
+                state = {field: state[field] for field in fields if field in state}
+            yield XBlockUserState(username, block_key, state, modified, scope)
+
+    def set_many(self, username, block_keys_to_state, scope=None):
+        student_id = self._user_id(username)
+        connection = self.database.connection
+        for usage_key, state in block_keys_to_state.items():
+            now = datetime.datetime.utcnow()
+            # StudentModule.objects.get_or_create
+            row = connection.execute(
+                'SELECT id, state FROM courseware_studentmodule '
+                'WHERE student_id = ? AND course_id = ? AND module_id = ?',
+                (student_id, unicode(usage_key.course_key), unicode(usage_key)),
+            ).fetchone()
+            if row is None:
+                connection.execute(
+                    'INSERT INTO courseware_studentmodule '
+                    '(module_type, module_id, student_id, state, created, modified, done, course_id) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (usage_key.block_type, unicode(usage_key), student_id, json.dumps(state), now, now, 'na',
+                     unicode(usage_key.course_key)),
+                )
+            else:
+                current_state = json.loads(row[1])
+                current_state.update(state)
+                connection.execute(
+                    'UPDATE courseware_studentmodule SET state = ?, modified = ? WHERE id = ?',
+                    (json.dumps(current_state), now, row[0]),
+                )
+
+    def bulk_create(self, username, block_keys_to_state):
+        """
+        Create the StudentModules of blocks which have none yet, in a single
+        multi-row INSERT, and return True.
+        """
+        student_id = self._user_id(username)
+        now = datetime.datetime.utcnow()
+        self.database.connection.executemany(
+            'INSERT INTO courseware_studentmodule '
+            '(module_type, module_id, student_id, state, created, modified, done, course_id) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (
+                (usage_key.block_type, unicode(usage_key), student_id, json.dumps(state), now, now, 'na',
+                 unicode(usage_key.course_key))
+                for usage_key, state in block_keys_to_state.iteritems()
+            )
+        )
+        return True
+
+
+def transactional(func):
+    """
+    Run a task in a database transaction, committed once the task is done.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        connection = get_database().connection
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            connection.rollback()
+            raise
+        connection.commit()
+        return result
+    return wrapper
+
+
+def create_client():
+    """
+    Return a SQLiteUserStateClient for a new user.
+    """
+    database = get_database()
+    return SQLiteUserStateClient(database, database.create_user())
+
+
+# The SQLite database can't be changed during a run.
+DATABASE_PARAMS = ()
+
+
+def database_params():
+    return {}
+
+
+def set_database_params(params):
+    pass
@@ -12,6 +12,7 @@ from helpers import auto_auth_tasks
 from helpers import settings
 
 from tasks import dapi_constants
+from thread_ids import get_thread_ids
 
 
 class UnexpectedResponse(Exception):
@@ -21,6 +22,21 @@ class UnexpectedResponse(Exception):
     pass
 
 
+def response_json(response):
+    """
+    Return the decoded JSON body of response.
+
+    The body is decoded only once, however many times this is called for the
+    same response, since decoding pages of threads and comments is the main
+    client side cost of these tests.
+    """
+    try:
+        return response.decoded_json
+    except AttributeError:
+        response.decoded_json = response.json()
+        return response.decoded_json
+
+
 class DiscussionsApiTasks(auto_auth_tasks.AutoAuthTasks):
     """
     Parent class of the discussion api tasks.
@@ -32,11 +48,8 @@ class DiscussionsApiTasks(auto_auth_tasks.AutoAuthTasks):
 
         self.url_prefix = "/api/discussion/v1"
 
-        if settings.data.get('SEEDED_DATA') is not None:
-            with open("" + settings.data['SEEDED_DATA'], 'r') as seeded_data:
-                self.thread_id_list = seeded_data.read().splitlines()
-        else:
-            self.thread_id_list = []
+        # Shared by all TaskSet instances in this process.
+        self.thread_id_list = get_thread_ids(settings.data.get('SEEDED_DATA'))
 
         self.verbose = True if (settings.data['VERBOSE']) else False
         self.pages = len(self.thread_id_list) / int(dapi_constants.PAGE_SIZE[0])
@@ -156,13 +169,14 @@ class DiscussionsApiTasks(auto_auth_tasks.AutoAuthTasks):
         response = self.client.get(url=url, verify=False, name=name)
         self.verify_response(response, url)
 
-        if not response.json()["results"]:
+        threads = response_json(response)["results"]
+        if not threads:
             return None
         if prioritize_comments:
-            threads_with_comments = [thread for thread in response.json()["results"] if thread["comment_count"] > 0]
+            threads_with_comments = [thread for thread in threads if thread["comment_count"] > 0]
             if threads_with_comments:
                 return random.choice(threads_with_comments)
-        return random.choice(response.json()["results"])
+        return random.choice(threads)
 
     def get_random_comment(self, thread, verbose=False):
         """
@@ -196,8 +210,9 @@ class DiscussionsApiTasks(auto_auth_tasks.AutoAuthTasks):
 
         response = self.client.get(url, verify=False, name=name)
         self.verify_response(response, url)
-        if response.json()["results"]:
-            return random.choice(response.json()["results"])
+        comments = response_json(response)["results"]
+        if comments:
+            return random.choice(comments)
         return None
 
     def post_thread(self):
@@ -225,7 +240,7 @@ class DiscussionsApiTasks(auto_auth_tasks.AutoAuthTasks):
         )
 
         self.verify_response(response, url)
-        return response.json()
+        return response_json(response)
 
     def create_response(self, thread_id):
         """
@@ -249,7 +264,7 @@ class DiscussionsApiTasks(auto_auth_tasks.AutoAuthTasks):
             name="POST_comment_response"
         )
         self.verify_response(response, url)
-        return response.json()
+        return response_json(response)
 
     def create_comment(self, comment_id, thread_id):
         """
@@ -276,7 +291,7 @@ class DiscussionsApiTasks(auto_auth_tasks.AutoAuthTasks):
             name="POST_comment_comment"
         )
         self.verify_response(response, url)
-        return response.json()
+        return response_json(response)
 
     def get_comment_and_response_count(self, thread_id):
         """
@@ -295,8 +310,8 @@ class DiscussionsApiTasks(auto_auth_tasks.AutoAuthTasks):
         url = "{}/threads/{}/".format(self.url_prefix, thread_id)
         response = self.client.get(url, verify=False, name="GET_thread")
         self.verify_response(response, url)
-        response = response.json()
-        return response["comment_count"], response["response_count"]
+        thread = response_json(response)
+        return thread["comment_count"], thread["response_count"]
 
     def patch_thread(self, thread_id, data, name):
         """
@@ -319,7 +334,7 @@ class DiscussionsApiTasks(auto_auth_tasks.AutoAuthTasks):
             name=name
         )
         self.verify_response(response, url)
-        return response.json()
+        return response_json(response)
 
     def patch_comment(self, comment_id, data, name):
         """
@@ -342,7 +357,7 @@ class DiscussionsApiTasks(auto_auth_tasks.AutoAuthTasks):
             name=name
         )
         self.verify_response(response, url)
-        return response.json()
+        return response_json(response)
 
     def delete_course_thread(self, thread_id):
         """
@@ -0,0 +1,293 @@
+"""
+Seeds discussions with several workers at once.
+
+Seeding is split into identical units of work ("jobs"), e.g. one thread with
+its responses and comments, or one batch of 10 threads.  Jobs are run by a
+bounded pool of threads, each with its own HTTP session sharing the login
+cookies of the seeder which was logged in.  Every request made by a worker:
+
+* waits for a token from a rate limiter shared by all workers, and
+* is retried, with exponential backoff, when it fails with a 5xx status or a
+  connection error.
+
+The thread ids created by each job are appended to the output file as soon as
+the job is done, and the number of jobs done is then saved in a checkpoint file
+next to it (<file name>.checkpoint).  If seeding is interrupted, running the
+same command again resumes where it stopped, in the same course.
+"""
+import itertools
+import json
+from multiprocessing import TimeoutError
+from multiprocessing.pool import ThreadPool
+import os
+import random
+import threading
+import time
+
+import requests
+
+# Number of threads per page when reading all threads of a course.
+THREADS_PAGE_SIZE = 100
+
+# Statuses which are retried, as they usually mean the LMS or the comments
+# service is overloaded rather than that the request is wrong.
+RETRY_STATUSES = (500, 502, 503, 504)
+
+
+class RateLimiter(object):
+    """
+    A token bucket limiting the rate of requests across threads.
+    """
+
+    def __init__(self, rate=None):
+        """
+        Arguments:
+            rate (float): the maximum number of requests per second, or None
+                for no limit.
+        """
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._tokens = 1.0
+        self._updated = time.time()
+
+    def wait(self):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.time()
+                self._tokens = min(max(1.0, self.rate), self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+
+class SeederSession(requests.Session):
+    """
+    A requests Session which is rate limited, and which retries requests
+    failing with a 5xx status or a connection error.
+    """
+
+    def __init__(self, rate_limiter, max_retries=5, backoff_base=1.0, backoff_max=30.0):
+        super(SeederSession, self).__init__()
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def _backoff(self, attempt):
+        # "Full jitter", so that workers failing together don't retry together.
+        time.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt)))
+
+    def request(self, method, url, *args, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.wait()
+            try:
+                response = super(SeederSession, self).request(method, url, *args, **kwargs)
+            except requests.ConnectionError as error:
+                if attempt == self.max_retries:
+                    raise
+                print "{} {}: {}. Retrying.".format(method, url, error)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    return response
+                print "{} {}: {}. Retrying.".format(method, url, response.status_code)
+            self._backoff(attempt)
+
+
+class PageReadException(Exception):
+    """Raised when a page of threads can't be read"""
+    pass
+
+
+class Checkpoint(object):
+    """
+    The progress of a seeding run, saved as json in <file_name>.checkpoint:
+    the number of jobs completed, or, when dumping the threads of a course, the
+    pages written.
+    """
+
+    def __init__(self, file_name):
+        self.path = file_name + '.checkpoint'
+        self.course_id = None
+        self.completed = 0
+        self.pages = set()
+        if os.path.exists(self.path):
+            with open(self.path) as checkpoint_file:
+                data = json.load(checkpoint_file)
+            self.course_id = data['course_id']
+            self.completed = data['completed']
+            self.pages = set(data.get('pages', []))
+
+    def save(self):
+        # Write then rename, so that an interruption never leaves a truncated
+        # checkpoint behind.
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as checkpoint_file:
+            json.dump(
+                {'course_id': self.course_id, 'completed': self.completed, 'pages': sorted(self.pages)},
+                checkpoint_file,
+            )
+        os.rename(temp_path, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class ConcurrentSeeder(object):
+    """
+    Runs seeding jobs concurrently, on behalf of a logged in DiscussionsSeeder.
+    """
+
+    def __init__(self, seeder, workers=1, rate=None, max_retries=5):
+        """
+        Arguments:
+            seeder (DiscussionsSeeder): a seeder which is logged in to the LMS.
+            workers (int): the number of jobs run at once.
+            rate (float): the maximum number of requests per second across all
+                workers, or None for no limit.
+            max_retries (int): how many times a failing request is retried.
+        """
+        self.seeder = seeder
+        self.workers = workers
+        self.rate_limiter = RateLimiter(rate)
+        self.max_retries = max_retries
+        self._local = threading.local()
+
+    def _worker_seeder(self):
+        """
+        Return the seeder of the current worker thread, creating it the first
+        time with a session sharing the cookies of the logged in seeder.
+        """
+        worker_seeder = getattr(self._local, 'seeder', None)
+        if worker_seeder is None:
+            worker_seeder = type(self.seeder)(course_id=self.seeder.course_id, lms_url=self.seeder.lms_url)
+            worker_seeder.sess = SeederSession(self.rate_limiter, max_retries=self.max_retries)
+            worker_seeder.sess.auth = self.seeder.sess.auth
+            worker_seeder.sess.cookies.update(self.seeder.sess.cookies)
+            self._local.seeder = worker_seeder
+        return worker_seeder
+
+    def _run_job(self, job):
+        return job(self._worker_seeder())
+
+    def _results(self, pool, func, iterable):
+        """
+        Yield the results of func over iterable, in the order they complete.
+        """
+        results = pool.imap_unordered(func, iterable)
+        while True:
+            try:
+                # Waiting without a timeout can't be interrupted with Ctrl-C.
+                yield results.next(timeout=1)
+            except StopIteration:
+                return
+            except TimeoutError:
+                continue
+
+    @staticmethod
+    def _checkpoint(file_name, course_id):
+        """
+        Return the Checkpoint of a run into file_name, for course_id.
+        """
+        checkpoint = Checkpoint(file_name)
+        if checkpoint.course_id not in (None, course_id):
+            raise ValueError("{} was seeding {}, not {}. Remove it to start over.".format(
+                checkpoint.path, checkpoint.course_id, course_id
+            ))
+        checkpoint.course_id = course_id
+        return checkpoint
+
+    def run(self, job, count, course_id, file_name):
+        """
+        Run job count times, appending the thread ids it returns to file_name.
+
+        Jobs already done by an interrupted run into the same file are skipped.
+
+        Arguments:
+            job: a function taking a DiscussionsSeeder, and returning the list
+                of thread ids it created.
+            count (int): the number of times to run job.
+            course_id (str): the course being seeded.
+            file_name (str): the file to write thread ids to.
+        """
+        checkpoint = self._checkpoint(file_name, course_id)
+        if checkpoint.completed:
+            print "Resuming after {} of {} jobs".format(checkpoint.completed, count)
+        else:
+            # Starting over: don't keep thread ids from an older run.
+            open(file_name, 'w').close()
+
+        pool = ThreadPool(self.workers)
+        try:
+            with open(file_name, 'a') as file_:
+                remaining = xrange(count - checkpoint.completed)
+                for thread_ids in self._results(pool, lambda __: self._run_job(job), remaining):
+                    for thread_id in thread_ids:
+                        file_.write(thread_id + "\n")
+                    file_.flush()
+                    checkpoint.completed += 1
+                    checkpoint.save()
+                    print "Completed {} of {} jobs".format(checkpoint.completed, count)
+        finally:
+            pool.terminate()
+        checkpoint.remove()
+
+    def _get_thread_page(self, course_id, page):
+        """
+        Return a page of the threads of a course, as returned by the
+        Discussion API.
+        """
+        worker_seeder = self._worker_seeder()
+        response = worker_seeder.sess.get(
+            "{}/api/discussion/v1/threads/".format(worker_seeder.lms_url),
+            params={'course_id': course_id, 'page_size': THREADS_PAGE_SIZE, 'page': page},
+        )
+        if response.status_code != 200:
+            raise PageReadException("Page {}: {}: {}".format(page, response.status_code, response.content[0:200]))
+        return response.json()
+
+    def dump_course_threads(self, course_id, file_name):
+        """
+        Write the ids of all threads of a course to file_name.
+
+        The first page gives the number of pages, which are then read
+        concurrently, each page being written as soon as it comes back.  If a
+        page can't be read, the pages written so far are kept, and running the
+        dump again only reads the others.
+        """
+        checkpoint = self._checkpoint(file_name, course_id)
+        if checkpoint.pages:
+            print "Resuming after {} pages".format(len(checkpoint.pages))
+        else:
+            open(file_name, 'w').close()
+
+        first_page = self._get_thread_page(course_id, 1)
+        num_pages = first_page["pagination"]["num_pages"]
+        remaining = [page for page in xrange(2, num_pages + 1) if page not in checkpoint.pages]
+
+        pool = ThreadPool(self.workers)
+        try:
+            with open(file_name, 'a') as file_:
+                pages = self._results(
+                    pool, lambda page: (page, self._get_thread_page(course_id, page)), remaining
+                )
+                for page, response in itertools.chain([(1, first_page)], pages):
+                    if page in checkpoint.pages:
+                        continue
+                    for thread in response["results"]:
+                        file_.write(thread["id"] + "\n")
+                    file_.flush()
+                    checkpoint.pages.add(page)
+                    checkpoint.save()
+                    print "Saved page {} of {}".format(len(checkpoint.pages), num_pages)
+        except PageReadException:
+            print "Stopped after {} of {} pages. Run again to read the others.".format(len(checkpoint.pages), num_pages)
+            raise
+        finally:
+            pool.terminate()
+        checkpoint.remove()
@@ -1,7 +1,6 @@
 import json
-import time
-import urllib
 
+from concurrent_seeder import ConcurrentSeeder
 from seeder import Seeder
 
 
@@ -34,29 +33,31 @@ class DiscussionsSeeder(Seeder):
             The list of thread ids created.
 
         """
-        topic_id = "course"
-        body = {
-            "course_id": course_id,
-            "topic_id": topic_id,
-            "type": "discussion",
-            "title": "Thread with R-C {}-{}".format(responses, child_comments),
-            "raw_body": "This is a thread. {}".format(self.raw_body),
-        }
-
         thread_list = []
         for p in range(0, posts):
-            thread_id = self.create_thread(body)
-            thread_list.append(thread_id)
+            thread_list.extend(self.seed_comment_thread(course_id, responses, child_comments))
+            print "Created thread {} of {} with {} responses and {} comments".format(str(p + 1), posts, responses, child_comments)
+
+        return thread_list
 
-            for i in range(0, responses):
-                comment_id = self.create_comment(thread_id)
+    def seed_comment_thread(self, course_id, responses, child_comments):
+        """
+        Creates one post, with responses and comments, in the "course" topic.
 
-                for j in range(0, child_comments):
-                    self.create_comment(thread_id, comment_is_child=comment_id)
+        Returns:
+            A list containing the id of the thread created.
 
-            print "Created thread {} of {} with {} responses and {} comments".format(str(p + 1), posts, responses, child_comments)
+        """
+        body = self.get_thread_body(course_id, "Thread with R-C {}-{}".format(responses, child_comments))
+        thread_id = self.create_thread(body)
 
-        return thread_list
+        for i in range(0, responses):
+            comment_id = self.create_comment(thread_id)
+
+            for j in range(0, child_comments):
+                self.create_comment(thread_id, comment_is_child=comment_id)
+
+        return [thread_id]
 
     def seed_threads(self, course_id, posts):
         """
@@ -66,36 +67,52 @@ class DiscussionsSeeder(Seeder):
             course_key (str): The courses identifier
             posts (int): Posts to be created in multiples of 10
         """
-        topic_id = "course"
-        body = {
+        for i in range(0, posts):
+            self.seed_thread_batch(course_id)
+            print "Created {} of {} posts".format(((i + 1) * 10), posts * 10)
+
+    def seed_thread_batch(self, course_id):
+        """
+        Creates a batch of 10 test threads/comments in the "course" topic.
+
+        Returns:
+            The list of thread ids created.
+
+        """
+        body = self.get_thread_body(course_id, "default thread")
+        thread_list = [
+            self.create_thread(body),
+            self.create_thread(body),
+            self.create_thread(body, question=True),
+            self.create_thread(body, question=True),
+        ]
+        for field in ("following", "voted", "abuse_flagged"):
+            thread_id = self.create_thread(body)
+            self.create_toggled_field(field=field, post_type="threads", id=thread_id)
+            thread_list.append(thread_id)
+        thread_id = self.create_thread(body)
+        comment_id = self.create_comment(thread_id)
+        self.create_comment(thread_id, comment_is_child=comment_id)
+        thread_list.append(thread_id)
+        for j in range(0, 2):
+            thread_id = self.create_thread(body)
+            self.create_comment(thread_id)
+            thread_list.append(thread_id)
+        return thread_list
+
+    def get_thread_body(self, course_id, title):
+        return {
             "course_id": course_id,
-            "topic_id": topic_id,
+            "topic_id": "course",
             "type": "discussion",
-            "title": "default thread",
+            "title": title,
             "raw_body": "This is a thread. {}".format(self.raw_body),
         }
 
-        # Create 10 Threads
-        for i in range(0, posts):
-            self.create_thread(body)
-            self.create_thread(body)
-            self.create_thread(body, question=True)
-            self.create_thread(body, question=True)
-            self.create_toggled_field(field="following", post_type="threads", id=self.create_thread(body))
-            self.create_toggled_field(field="voted", post_type="threads", id=self.create_thread(body))
-            self.create_toggled_field(field="abuse_flagged", post_type="threads", id=self.create_thread(body))
-            thread_id = self.create_thread(body)
-            comment_id = self.create_comment(thread_id)
-            self.create_comment(thread_id, comment_is_child=comment_id)
-            for j in range(0, 2):
-                thread_id = self.create_thread(body)
-                self.create_comment(thread_id)
-            print "Created {} of {} posts".format(((i + 1) * 10), posts * 10)
-
     def create_thread(self, body, question=False):
         url = "{}/api/discussion/v1/threads/".format(self.lms_url)
         if question:
-            body["type"] = "question"
+            body = dict(body, type="question")
         response = self.sess.post(
             url=url,
             data=json.dumps(body),
@@ -143,7 +160,7 @@ class DiscussionsSeeder(Seeder):
 
         return response.json()["id"]
 
-    def create_thread_data_file(self, file_name, course_id, thread_id_list):
+    def create_thread_data_file(self, file_name, course_id, thread_id_list, workers=1, rate=None, max_retries=5):
         """
         Creates a file with the thread_ids for given course_id
 
@@ -152,37 +169,18 @@ class DiscussionsSeeder(Seeder):
             file_name (str): Name of the file to save to
             thread_id_list (list): A list of thread ids, or None to read all
                 thread ids from the course.
+            workers (int): Number of pages of threads read at once, when
+                reading all thread ids from the course.
+            rate (float): Maximum number of requests per second when reading
+                all thread ids from the course, or None for no limit.
+            max_retries (int): Number of times a request for a page of threads
+                is retried.
 
         """
-        # TODO: Consider splitting the case of reading all threads for a course
-        # into a list into a separate function that is more explicit.  This
-        # function would simply be for writing the list to a file.
         if not thread_id_list:
-            course_id = urllib.quote_plus(course_id)
-            url = "{}/api/discussion/v1/threads/?course_id={}&page_size=100".format(self.lms_url, course_id)
-            response = self.sess.get(url)\
-
-            if response.status_code != 200:
-                print "{}: {}".format(response.status_code, response.content[0:200])
-                return
-
-            response = response.json()
-
-            thread_id_list = []
-            for thread in response["results"]:
-                thread_id_list.append(thread["id"])
-            while response["pagination"]["next"]:
-                next_page_url = response["pagination"]["next"]
-                response = self.sess.get(next_page_url)
-                while response.status_code != 200:
-                    print "{}: Could not get next in response. Trying again in 5 seconds".format(response.status_code)
-                    time.sleep(5)
-                    response = self.sess.get(next_page_url)
-                response = response.json()
-                if response["pagination"]["next"]:
-                    print "GETting page {}".format(response["pagination"]["next"].split("&page=")[1])
-                for thread in response["results"]:
-                    thread_id_list.append(thread["id"])
+            concurrent_seeder = ConcurrentSeeder(self, workers=workers, rate=rate, max_retries=max_retries)
+            concurrent_seeder.dump_course_threads(course_id, file_name)
+            return
 
         with open(file_name, 'w') as file_:
             l = len(thread_id_list)
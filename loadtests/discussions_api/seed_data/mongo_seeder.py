@@ -0,0 +1,210 @@
+"""
+Seeds discussions by writing directly into the comments service database.
+
+Creating threads through the Discussion API runs every post through the LMS and
+the comments service, which takes hours for millions of posts.  This script
+instead writes thread and comment documents straight into the "contents"
+collection, in batches:
+
+#. the indexes of "contents" (except _id) are dropped, so that they don't have
+   to be maintained during the load,
+#. the documents are inserted with insert_many,
+#. the indexes listed in discussions_api/db/create_indexes.js are built.
+
+The ids of the threads created are written to a file, to be used as the
+SEEDED_DATA of the discussions_api load test.
+
+Usage (from the edx-load-tests directory, with the comments service stopped):
+
+    python discussions_api/seed_data/mongo_seeder.py -d cs_comments_service_development \\
+        -c course-v1:testX+C1+2016_C1 --author-id 3 --author-username staff -t 1000000 -r 2 -m 3
+"""
+import argparse
+from collections import OrderedDict
+import datetime
+import itertools
+import json
+import os
+import sys
+
+from bson import ObjectId
+import pymongo
+
+INDEXES_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'db', 'create_indexes.js')
+
+CONTENTS_COLLECTION = 'contents'
+
+RAW_BODY = (
+    "Arthur looked up. 'Ford!' he said, 'there's an infinite number of monkeys outside who want to talk to us "
+    "about this script for Hamlet they've worked out."
+)
+
+
+def contents_indexes(indexes_file=INDEXES_FILE):
+    """
+    Read the indexes of the contents collection from create_indexes.js.
+
+    Returns:
+        list of pymongo IndexModels, except the one on _id.
+    """
+    with open(indexes_file) as js_file:
+        script = js_file.read()
+    start = script.index('[', script.index('var contentsIndexes'))
+    end = script.index('];', start) + 1
+    indexes = json.loads(script[start:end], object_pairs_hook=OrderedDict)
+    return [
+        pymongo.IndexModel(
+            index['key'].items(),
+            name=index['name'],
+            background=index.get('background', False),
+            sparse=index.get('sparse', False),
+        )
+        for index in indexes
+        if index['name'] != '_id_'
+    ]
+
+
+class MongoSeeder(object):
+    """
+    Generates and inserts the documents of threads, with their responses and
+    comments, as the comments service would store them.
+    """
+
+    def __init__(self, course_id, author_id, author_username, start_time=None):
+        self.course_id = course_id
+        self.author_id = str(author_id)
+        self.author_username = author_username
+        self.start_time = start_time or datetime.datetime.utcnow()
+
+    def _content(self, content_type, body, created_at):
+        """
+        The fields shared by threads and comments.
+        """
+        return {
+            '_id': ObjectId(),
+            '_type': content_type,
+            'course_id': self.course_id,
+            'body': body,
+            'author_id': self.author_id,
+            'author_username': self.author_username,
+            'anonymous': False,
+            'anonymous_to_peers': False,
+            'visible': True,
+            'abuse_flaggers': [],
+            'historical_abuse_flaggers': [],
+            'at_position_list': [],
+            'votes': {'up': [], 'down': [], 'up_count': 0, 'down_count': 0, 'count': 0, 'point': 0},
+            'created_at': created_at,
+            'updated_at': created_at,
+        }
+
+    def thread_documents(self, responses, child_comments, created_at):
+        """
+        Return the documents of one thread, with its responses and comments.
+
+        The thread document comes first.
+        """
+        thread = self._content('CommentThread', "This is a thread. {}".format(RAW_BODY), created_at)
+        thread.update({
+            'title': "Thread with R-C {}-{}".format(responses, child_comments),
+            'thread_type': 'discussion',
+            'context': 'course',
+            'commentable_id': 'course',
+            'closed': False,
+            'comment_count': responses * (1 + child_comments),
+            'last_activity_at': created_at,
+        })
+        documents = [thread]
+        for __ in xrange(responses):
+            response = self._content('Comment', "Orphaned comment aka Batman. {}".format(RAW_BODY), created_at)
+            response.update({
+                'comment_thread_id': thread['_id'],
+                'parent_ids': [],
+                'sk': str(response['_id']),
+                'endorsed': False,
+                'child_count': child_comments,
+            })
+            documents.append(response)
+            for __ in xrange(child_comments):
+                comment = self._content('Comment', "Comment with parent. {}".format(RAW_BODY), created_at)
+                comment.update({
+                    'comment_thread_id': thread['_id'],
+                    'parent_id': response['_id'],
+                    'parent_ids': [response['_id']],
+                    'sk': '{}-{}'.format(response['_id'], comment['_id']),
+                    'endorsed': False,
+                    'child_count': 0,
+                })
+                documents.append(comment)
+        return documents
+
+    def threads(self, posts, responses, child_comments):
+        """
+        Yield the documents of each thread, one second apart and ending at
+        start_time, so that they sort in the order they were generated.
+        """
+        first_created_at = self.start_time - datetime.timedelta(seconds=posts)
+        for index in xrange(posts):
+            yield self.thread_documents(responses, child_comments, first_created_at + datetime.timedelta(seconds=index))
+
+    def seed(self, collection, posts, responses, child_comments, file_name, batch_size=1000):
+        """
+        Insert the threads into collection, and write their ids to file_name.
+
+        Arguments:
+            collection (Collection): the contents collection.
+            posts (int): the number of threads.
+            responses (int): the number of responses per thread.
+            child_comments (int): the number of comments per response.
+            file_name (str): the file to write thread ids to.
+            batch_size (int): the number of threads inserted at once.
+        """
+        if collection.name in collection.database.collection_names():
+            print "Dropping indexes of {}".format(collection.full_name)
+            collection.drop_indexes()
+
+        threads = self.threads(posts, responses, child_comments)
+        done = 0
+        with open(file_name, 'w') as file_:
+            while done < posts:
+                batch = list(itertools.islice(threads, batch_size))
+                collection.insert_many(
+                    [document for documents in batch for document in documents],
+                    ordered=False,
+                )
+                for documents in batch:
+                    file_.write(str(documents[0]['_id']) + "\n")
+                file_.flush()
+                done += len(batch)
+                print "Inserted {} of {} threads".format(done, posts)
+
+        print "Building indexes of {}".format(collection.full_name)
+        collection.create_indexes(contents_indexes())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seeds threads directly into the comments service database.")
+    parser.add_argument('--host', help='MongoDB host.', default='localhost')
+    parser.add_argument('--port', help='MongoDB port.', type=int, default=27017)
+    parser.add_argument('-d', '--database', help='Comments service database.', default='cs_comments_service_development')
+    parser.add_argument('-c', '--course', help='Course id for adding threads.', required=True)
+    parser.add_argument('--author-id', help='User id of the author of every post.', required=True)
+    parser.add_argument('--author-username', help='Username of the author of every post.', required=True)
+    parser.add_argument('-t', '--threads', help='Number of threads.', type=int, required=True)
+    parser.add_argument('-r', '--responses', help='Number of responses per thread.', type=int, default=0)
+    parser.add_argument('-m', '--comments', help='Number of comments per response.', type=int, default=0)
+    parser.add_argument('-b', '--batch-size', help='Number of threads inserted at once.', type=int, default=1000)
+    parser.add_argument('-o', '--output', help='File to write thread ids to.', default='')
+    args = parser.parse_args()
+
+    file_name = args.output or 'MongoThreads{}'.format(args.threads)
+    collection = pymongo.MongoClient(host=args.host, port=args.port)[args.database][CONTENTS_COLLECTION]
+    seeder = MongoSeeder(args.course, args.author_id, args.author_username)
+    seeder.seed(collection, args.threads, args.responses, args.comments, file_name, batch_size=args.batch_size)
+
+    print "Run locust with COURSE_ID={}".format(args.course)
+    print "Run locust with SEEDED_DATA={}".format(file_name)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
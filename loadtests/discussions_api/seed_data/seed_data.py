@@ -5,6 +5,7 @@ import sys
 import textwrap
 import uuid
 
+from concurrent_seeder import Checkpoint, ConcurrentSeeder
 from course_seeder import CourseSeeder
 from discussions_seeder import DiscussionsSeeder
 
@@ -53,10 +54,13 @@ def save_course_thread_list_to_file(args, seeder=None):
         print "Requires a course_id"
         return
     file_name = args.action
-    save_threads_to_file(seeder, file_name, course_id=args.course, thread_id_list=None)
+    save_threads_to_file(
+        seeder, file_name, course_id=args.course, thread_id_list=None, workers=int(args.workers),
+        rate=float(args.rate) if args.rate else None, max_retries=int(args.retries),
+    )
 
 
-def save_threads_to_file(seeder, file_name, course_id, thread_id_list=None):
+def save_threads_to_file(seeder, file_name, course_id, thread_id_list=None, workers=1, rate=None, max_retries=5):
     """
     Handles printing necessary output when writing threads to a file.
 
@@ -66,10 +70,19 @@ def save_threads_to_file(seeder, file_name, course_id, thread_id_list=None):
         course_id (str): The course containing the threads.
         thread_id_list (list): A list of thread ids, or None to read all
             thread ids from the course.
+        workers (int): Number of pages of threads read at once, when reading
+            all thread ids from the course.
+        rate (float): Maximum number of requests per second when reading all
+            thread ids from the course, or None for no limit.
+        max_retries (int): Number of times a request for a page of threads is
+            retried.
 
     """
     print "Saving thread_ids to: {}".format(file_name)
-    seeder.create_thread_data_file(file_name=file_name, course_id=course_id, thread_id_list=thread_id_list)
+    seeder.create_thread_data_file(
+        file_name=file_name, course_id=course_id, thread_id_list=thread_id_list, workers=workers,
+        rate=rate, max_retries=max_retries,
+    )
     print "Run locust with SEEDED_DATA={}".format(file_name)
 
 
@@ -98,6 +111,32 @@ def get_course_id(args=None, course_id=None):
     return seed_course_id
 
 
+def seed_concurrently(args, seeder, job, count, course_id, file_name):
+    """
+    Runs a seeding job count times with the workers given in args, writing
+    the thread ids created to a file as they come back.
+
+    Arguments:
+        args: Parser args.
+        seeder: The DiscussionSeeder, logged in to the LMS.
+        job: A function taking a DiscussionSeeder and returning a list of the
+            thread ids it created.
+        count (int): The number of times to run the job.
+        course_id (str): The course being seeded.
+        file_name (str): The file to write thread ids to.
+
+    """
+    concurrent_seeder = ConcurrentSeeder(
+        seeder,
+        workers=int(args.workers),
+        rate=float(args.rate) if args.rate else None,
+        max_retries=int(args.retries),
+    )
+    print "Saving thread_ids to: {}".format(file_name)
+    concurrent_seeder.run(job, count, course_id, file_name)
+    print "Run locust with SEEDED_DATA={}".format(file_name)
+
+
 def create_threads(args, course_id=None, seeder=None, save_threads=True):
     """
     Creates threads in multiples of 10 and then returns the locust commandline
@@ -110,14 +149,15 @@ def create_threads(args, course_id=None, seeder=None, save_threads=True):
         3 have a response
     Threads=10, Responses=4, comments=1
     """
-    course_id = get_course_id(args, course_id)
-
-    seeder = seeder if seeder else setup_discussion_seeder(args)
     posts = int(args.batches or raw_input("How many threads in multiples of 10?"))
-    seeder.seed_threads(course_id=course_id, posts=posts)
     file_name = args.action + str(posts * 10)
+    course_id = get_course_id(args, course_id or args.course or Checkpoint(file_name).course_id)
+
+    seeder = seeder if seeder else setup_discussion_seeder(args)
     if save_threads:
-        save_threads_to_file(seeder, file_name, course_id)
+        seed_concurrently(args, seeder, lambda worker: worker.seed_thread_batch(course_id), posts, course_id, file_name)
+    else:
+        seeder.seed_threads(course_id=course_id, posts=posts)
 
 
 def create_comments(args, course_id=None, seeder=None, save_threads=True):
@@ -131,16 +171,20 @@ def create_comments(args, course_id=None, seeder=None, save_threads=True):
         save_threads: True if the new threads should be saved to a file, and False otherwise.
 
     """
-    course_id = get_course_id(args, course_id)
-
-    seeder = seeder if seeder else setup_discussion_seeder(args)
     posts = int(args.threads or raw_input("How many threads "))
     responses = int(args.responses or raw_input("How many responses for thread "))
     child_comments = int(args.comments or raw_input("How many comments for each response "))
-    thread_list = seeder.seed_comments(course_id=course_id, posts=posts, responses=responses, child_comments=child_comments)
     file_name = args.action + str(responses * child_comments)
+    course_id = get_course_id(args, course_id or args.course or Checkpoint(file_name).course_id)
+
+    seeder = seeder if seeder else setup_discussion_seeder(args)
     if save_threads:
-        save_threads_to_file(seeder, file_name, course_id, thread_id_list=thread_list)
+        seed_concurrently(
+            args, seeder, lambda worker: worker.seed_comment_thread(course_id, responses, child_comments),
+            posts, course_id, file_name,
+        )
+    else:
+        seeder.seed_comments(course_id=course_id, posts=posts, responses=responses, child_comments=child_comments)
 
 
 def main():
@@ -176,6 +220,9 @@ def main():
     parser.add_argument('-r', '--responses', help='Number of responses per thread. You will be prompted if needed and not supplied.', default='')
     parser.add_argument('-m', '--comments', help='Number of comments per response. You will be prompted if needed and not supplied.', default='')
     parser.add_argument('-c', '--course', help='Course id for adding threads.  If not supplied, a course will be created for you.', default='')
+    parser.add_argument('-w', '--workers', help='Number of threads or batches seeded, or pages of threads dumped, at once.', default=1)
+    parser.add_argument('--rate', help='Maximum number of requests per second across all workers. Unlimited if not supplied.', default='')
+    parser.add_argument('--retries', help='Number of times a request failing with a 5xx status is retried.', default=5)
 
     parser.epilog = "script actions/tasks:"
     for action in actions:
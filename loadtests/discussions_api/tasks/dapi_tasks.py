@@ -5,7 +5,7 @@ import random
 
 from locust import task
 
-from ..dapi import DiscussionsApiTasks
+from ..dapi import DiscussionsApiTasks, response_json
 import dapi_constants
 
 
@@ -110,8 +110,8 @@ class GetCommentsTask(DiscussionsApiTasks):
         url = "/api/discussion/v1/threads/{}/".format(thread_id)
         response = self.client.get(url, verify=False, name="GET_thread")
         if response.status_code == 200:
-            response = response.json()
-            return response["comment_count"], response["response_count"]
+            thread = response_json(response)
+            return thread["comment_count"], thread["response_count"]
         else:
             print "{}: {}".format(response.status_code, response.content[0:200])
 
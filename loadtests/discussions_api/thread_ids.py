@@ -0,0 +1,69 @@
+"""
+Process-wide index of the seeded thread ids of the Discussions API tests.
+
+The SEEDED_DATA file written by seed_data.py contains one thread id per line,
+and can easily contain a million of them.  Rather than every TaskSet instance
+reading the file into its own list of strings, it is read once per process into
+a ThreadIdIndex, which all TaskSet instances share:
+
+    thread_ids = get_thread_ids(settings.data.get('SEEDED_DATA'))
+    thread_id = random.choice(thread_ids)
+"""
+
+# Indexes loaded by this process, keyed by filename.
+_indexes = {}
+
+
+class ThreadIdIndex(object):
+    """
+    A compact, read-only sequence of thread ids.
+
+    Thread ids are normally Mongo ObjectIds, which are all 24 characters long,
+    so they are packed into a single string and sliced out by index.  Ids of
+    differing lengths are kept in a tuple instead.
+    """
+
+    def __init__(self, thread_ids):
+        widths = set(len(thread_id) for thread_id in thread_ids)
+        if len(widths) == 1:
+            self._width = widths.pop()
+            self._packed = ''.join(thread_ids)
+            self._ids = None
+        else:
+            self._width = None
+            self._packed = None
+            self._ids = tuple(thread_ids)
+        self._count = len(thread_ids)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if self._ids is not None:
+            return self._ids[index]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('thread id index out of range')
+        start = index * self._width
+        return self._packed[start:start + self._width]
+
+    def __iter__(self):
+        for index in xrange(self._count):
+            yield self[index]
+
+
+def get_thread_ids(filename):
+    """
+    Return the ThreadIdIndex of the thread ids in filename, one per line,
+    shared by all callers in this process so that the file is only read once.
+
+    If filename is None, an empty index is returned.
+    """
+    if filename not in _indexes:
+        if filename is None:
+            _indexes[filename] = ThreadIdIndex([])
+        else:
+            with open(filename, 'r') as seeded_data:
+                _indexes[filename] = ThreadIdIndex(seeded_data.read().split())
+    return _indexes[filename]
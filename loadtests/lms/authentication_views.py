@@ -9,11 +9,13 @@ class AuthenticationViewsTasks(LmsTasks):
     def login_logout(self):
         """
         Test the primary login/logout endpoints.
+
+        Always end logged in, so that the other tasks run by this locust are
+        made by a logged in user.
         """
         if self.locust._is_logged_in:
             self.logout()
-        else:
-            self.login()
+        self.login()
 
     @task(1)
     def stop(self):
@@ -3,11 +3,13 @@
 
 import logging
 
+import gevent
+from lazy import lazy
 from locust import TaskSet
 
 from helpers.edx_app import EdxAppTasks
 from helpers.mixins import EnrollmentTaskSetMixin
-from helpers import settings
+from helpers import admission, settings, session_cache
 
 
 class LmsTasks(EnrollmentTaskSetMixin, EdxAppTasks):
@@ -22,12 +24,27 @@ class LmsTasks(EnrollmentTaskSetMixin, EdxAppTasks):
         """
         return isinstance(self.parent, TaskSet)
 
+    @lazy
+    def _course_path_prefix(self):
+        """
+        The prefix of all course-specific LMS paths, rendered once per locust client.
+        """
+        return '/courses/{}/'.format(self.course_id)
+
+    @lazy
+    def _course_path_params(self):
+        """
+        The values of the string formatting placeholders allowed in course-specific paths.
+        """
+        return {n: getattr(self, n) for n in ('course_id', 'course_num', 'course_run', 'course_org')}
+
     def _request(self, method, path, *args, **kwargs):
         """
         Single internal helper for setting up course-specific LMS requests.
         """
-        path = '/courses/{course_id}/' + path
-        path = path.format(**{n: getattr(self, n) for n in ('course_id', 'course_num', 'course_run', 'course_org')})
+        if '{' in path:
+            path = path.format(**self._course_path_params)
+        path = self._course_path_prefix + path
         logging.debug(path)
         return getattr(self.client, method)(path, *args, **kwargs)
 
@@ -57,6 +74,7 @@ class LmsTasks(EnrollmentTaskSetMixin, EdxAppTasks):
         success = super(LmsTasks, self).auto_auth(*args, **kwargs)
         if success and self._user_id and self._email and self._password:
             self.locust._user_id = self._user_id
+            self.locust._username = self._username
             self.locust._email = self._email
             self.locust._password = self._password
         return success
@@ -76,6 +94,60 @@ class LmsTasks(EnrollmentTaskSetMixin, EdxAppTasks):
             self.locust._is_logged_in = True
         return success
 
+    @property
+    def _session_cache(self):
+        """
+        The SessionCache configured via SESSION_CACHE_DIR, or None.
+        """
+        directory = settings.data.get('SESSION_CACHE_DIR')
+        return session_cache.get_cache(directory) if directory else None
+
+    def restore_session(self):
+        """
+        Restore the cached session of the current user, if there is one.
+
+        A single request to the enrollment API checks that the session is
+        still logged in, and tells us whether the user is already enrolled.
+
+        Returns:
+            bool: True if the user is now logged in.
+        """
+        cache = self._session_cache
+        username = self.locust._username
+        if cache is None or not username:
+            return False
+        cookies = cache.load(username)
+        if not cookies:
+            return False
+
+        for name, value in cookies.items():
+            self.client.cookies.set(name, value)
+        response = self.client.get(
+            '/api/enrollment/v1/enrollment/{},{}'.format(username, self.course_id),
+            headers={'Accept': 'application/json'},
+            name='restore_session',
+        )
+        if response.status_code != 200:
+            cache.discard(username)
+            del self.client.cookies['sessionid']
+            return False
+
+        self.locust._is_logged_in = True
+        try:
+            self.locust._is_enrolled = bool(response.json()['is_active'])
+        except (KeyError, TypeError, ValueError):
+            # The response is empty if the user is not enrolled.
+            pass
+        return True
+
+    def save_session(self):
+        """
+        Save the session of the current user to the session cache, if enabled.
+        """
+        cache = self._session_cache
+        if cache is not None and self.locust._username:
+            cache.save(self.locust._username, self.client.cookies)
+
     def logout(self):
         response = self.client.get('/logout', name='logout', allow_redirects=False)
 
@@ -90,33 +162,65 @@ class LmsTasks(EnrollmentTaskSetMixin, EdxAppTasks):
             self.locust._is_enrolled = True
         return success
 
+    @property
+    def _admission(self):
+        """
+        The AdmissionController which throttles the setup steps in on_start.
+        """
+        return admission.get_controller(
+            max_concurrent=settings.data.get('SETUP_MAX_CONCURRENCY'),
+            rate=settings.data.get('SETUP_RATE'),
+        )
+
+    def _back_off(self):
+        """
+        Wait before retrying a failed setup step, for longer after each
+        consecutive failure.
+        """
+        self.locust._setup_failures += 1
+        gevent.sleep(admission.backoff_delay(
+            self.locust._setup_failures,
+            base=settings.data.get('SETUP_BACKOFF_BASE', 1.0),
+            cap=settings.data.get('SETUP_BACKOFF_MAX', 60.0),
+        ))
+
     def on_start(self):
+        self.ensure_setup()
+
+    def ensure_setup(self):
+        """
+        Register, log in and enroll the user, unless that is already done.
+
+        This is run by on_start, and, when the tasks of this TaskSet are
+        flattened into LmsTest, before each task, since other tasks may have
+        logged the user out in between.
+        """
         if not self.locust._is_registered:
-            self.auto_auth(params={'no_login': True})
+            self._admission.run('register', self.auto_auth, params={'no_login': True})
 
-            # If we failed to register the user, and this TaskSet is a child of the main LmsTest TaskSet, interrupt so
-            # that we can select another TaskSet and try to register again.
-            #
-            # NOTE: this is basically a retry mechanism without backoff, so it may behoove us to add delays to this
+            # If we failed to register the user, and this TaskSet is a child of the main LmsTest TaskSet, back off and
+            # interrupt so that we can select another TaskSet and try to register again.
             if self._is_child and not self.locust._is_registered:
+                self._back_off()
                 self.interrupt()
 
         if self.locust._is_registered and not self.locust._is_logged_in:
-            self.login()
+            self._admission.run('login', lambda: self.restore_session() or self.login())
 
-            # If we failed to log in, and this TaskSet is a child of the main LmsTest TaskSet, interrupt so
-            # that we can select another TaskSet and try to log in again.
-            #
-            # NOTE: this is basically a retry mechanism without backoff, so it may behoove us to add delays to this
+            # If we failed to log in, and this TaskSet is a child of the main LmsTest TaskSet, back off and interrupt
+            # so that we can select another TaskSet and try to log in again.
             if self._is_child and not self.locust._is_logged_in:
+                self._back_off()
                 self.interrupt()
 
         if self.locust._is_logged_in and not self.locust._is_enrolled:
-            self.enroll(self.course_id)
+            if self._admission.run('enroll', self.enroll, self.course_id):
+                self.save_session()
 
-            # If we failed to enroll, and this TaskSet is a child of the main LmsTest TaskSet, interrupt so
-            # that we can select another TaskSet and try to enroll again.
-            #
-            # NOTE: this is basically a retry mechanism without backoff, so it may behoove us to add delays to this
+            # If we failed to enroll, and this TaskSet is a child of the main LmsTest TaskSet, back off and interrupt
+            # so that we can select another TaskSet and try to enroll again.
             if self._is_child and not self.locust._is_enrolled:
+                self._back_off()
                 self.interrupt()
+
+        self.locust._setup_failures = 0
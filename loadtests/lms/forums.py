@@ -1,50 +1,16 @@
 from collections import deque
 import logging
-import os
 import random
-import string
 
 from lazy import lazy
 from base import LmsTasks
 from locust import task
 
-from helpers import settings
+from helpers import dummy_text, settings
 
 logging.basicConfig(level=logging.INFO)
 LOGGER = logging.getLogger(__name__)
 
-DICTIONARY_FILENAME = 'words.txt'
-_dictionary_words = []
-
-
-def _random_word_from_dictionary():
-    """
-    Get a random word from the dictionary file.
-    """
-    global _dictionary_words
-    dictionary_path = os.path.join(os.path.dirname(__file__), DICTIONARY_FILENAME)
-    # cache the entire dictionary in memory
-    if not _dictionary_words:
-        _dictionary_words = open(dictionary_path).read().splitlines()
-
-    return random.choice(_dictionary_words)
-
-
-def _dummy_text(minlen, maxlen):
-    """
-    Helper function to generate dummy text where needed in forums submissions.
-    """
-    desired_length = random.randrange(minlen, maxlen)
-    buf = ''
-    # We'll shoot for desired_length, but may end up overshooting.  It doesn't
-    # really matter.
-    while len(buf) < desired_length + 1:
-        buf += _random_word_from_dictionary()
-        buf += ' '
-    buf = buf[0:-1]  # cut off trailing space
-    buf = buf[0:maxlen]  # truncate
-    return buf
-
 
 class BaseForumsTasks(LmsTasks):
     """
@@ -122,8 +88,8 @@ class BaseForumsTasks(LmsTasks):
             Tuple: (topic_id, thread_id)
         """
         thread_data = {
-            'body': _dummy_text(100, 2000),  # NB size range not based on actual data.
-            'title': _dummy_text(20, 100),  # NB size range not based on actual data.
+            'body': dummy_text.dummy_text(100, 2000),  # NB size range not based on actual data.
+            'title': dummy_text.dummy_text(20, 100),  # NB size range not based on actual data.
             'thread_type': random.choice(('discussion', 'question')),
             'anonymous_to_peers': 'false',
             'anonymous': 'false',
@@ -149,8 +115,8 @@ class BaseForumsTasks(LmsTasks):
             thread_id: ID of the thread which will be updated
         """
         thread_data = {
-            'body': _dummy_text(100, 2000),  # NB size range not based on actual data.
-            'title': _dummy_text(20, 100),  # NB size range not based on actual data.
+            'body': dummy_text.dummy_text(100, 2000),  # NB size range not based on actual data.
+            'title': dummy_text.dummy_text(20, 100),  # NB size range not based on actual data.
         }
 
         self.post(
@@ -182,7 +148,7 @@ class BaseForumsTasks(LmsTasks):
         Post a response to an existing thread.
         """
         thread_data = {
-            'body': _dummy_text(100, 2000),  # NB size range not based on actual data.
+            'body': dummy_text.dummy_text(100, 2000),  # NB size range not based on actual data.
         }
         response = self.post(
             'discussion/threads/{}/reply'.format(thread_id),
@@ -197,7 +163,7 @@ class BaseForumsTasks(LmsTasks):
         Post a response to an existing thread.
         """
         thread_data = {
-            'body': _dummy_text(100, 2000),  # NB size range not based on actual data.
+            'body': dummy_text.dummy_text(100, 2000),  # NB size range not based on actual data.
         }
         self.post(
             'discussion/comments/{}/reply'.format(response_id),
@@ -264,7 +230,7 @@ class ForumsTasks(BaseForumsTasks):
         self.get(
             'discussion/forum/search',
             params={
-                'text': _random_word_from_dictionary(),
+                'text': dummy_text.random_word(),
             },
             name='forums:search_text',
         )
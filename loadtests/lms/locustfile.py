@@ -18,6 +18,7 @@ from module_render import ModuleRenderTasks
 from wiki_views import WikiViewTask
 from tracking import TrackingTasks
 from helpers import settings, markers
+from helpers.flatten_tasks import flatten_tasks
 
 settings.init(__name__, required_data=[
     'courses',
@@ -29,10 +30,15 @@ settings.init(__name__, required_data=[
 markers.install_event_markers()
 
 
+@flatten_tasks
 class LmsTest(LmsTasks):
     """
     TaskSet that pulls together all the LMS-related TaskSets into a single unified test.
 
+    The tasks of the child TaskSets are flattened into a single weighted table
+    (see helpers/flatten_tasks.py), so each locust runs tasks from all of them
+    without repeating their setup.
+
     See util/lms_tx_distribution.sh for instructions on generating the data
     below.
 
@@ -153,10 +159,12 @@ class LmsLocust(HttpLocust):
     def __init__(self, *args, **kwargs):
         super(LmsLocust, self).__init__(*args, **kwargs)
         self._user_id = None
+        self._username = None
         self._email = None
         self._password = None
         self._is_logged_in = False
         self._is_enrolled = False
+        self._setup_failures = 0
 
     @property
     def _is_registered(self):
@@ -1,10 +1,14 @@
+from collections import defaultdict
 import random
-import re
 
 from locust import task
 
 from base import LmsTasks
 
+# Handler paths rendered by ModuleRenderTasks._handler_path, keyed by course id
+# and then by (category, block_id, handler).
+_handler_paths = defaultdict(dict)
+
 
 class ModuleRenderTasks(LmsTasks):
     """
@@ -234,36 +238,32 @@ class ModuleRenderTasks(LmsTasks):
         """
         Given category, block_id (display name), and handler name, generate a path
         to invoke the handler via HTTP.
+
+        Paths are cached per course, since the same few are requested over and over.
         """
+        paths = _handler_paths[self.course_id]
+        try:
+            return paths[(category, block_id, handler)]
+        except KeyError:
+            pass
+
         # based directly on lms runtime implementation. see:
         # https://github.com/edx/edx-platform/blob/master/lms/djangoapps/lms_xblock/runtime.py#L18
-        def escape(match):
-            matched = match.group(0)
-            if matched == ';':
-                return ';;'
-            elif matched == '/':
-                return ';_'
-            else:
-                return matched
-
         usage_key = self.course_key.make_usage_key(category, block_id)
-        escaped = re.sub(ur'[;/]', escape, unicode(usage_key))
-        return "xblock/{}/handler/{}".format(escaped, handler)
+        escaped = unicode(usage_key).replace(';', ';;').replace('/', ';_')
+        path = paths[(category, block_id, handler)] = "xblock/{}/handler/{}".format(escaped, handler)
+        return path
 
     def _post_capa_handler(self, handler):
         """
         Internal helper for formulating valid requests using random inputs based on course data.
         """
-
-        def format_input_key(key):
-            return 'input_i4x-{{course_org}}-{{course_num}}-problem-{}'.format(problem_id) + key
-
-        problem_id, problem_data, problem_input = self.course_data.capa_problem
+        problem_id, problem_data, problem_input = self.course_data.capa_submission
         if handler == 'problem_show' and problem_data.get('showanswer', 'never') != 'always':
             # gonna fail
             return
         if handler in ('problem_save', 'problem_check'):
-            data = {format_input_key(key): value for key, value in problem_input.iteritems()}
+            data = problem_input
         else:
             data = None
         self.post(
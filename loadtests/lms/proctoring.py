@@ -22,9 +22,12 @@ class ProctoredExamTasks(LmsTasks):
 
     def create_attempt(self):
         """
-        Create an attempt for the current user.
+        Create an attempt for the current user, if the course has special exams.
         """
-        data = {'exam_id': self.course_data.exam_id, 'start_clock': True}
+        exam_id = self.course_data.exam_id
+        if exam_id is None:
+            return
+        data = {'exam_id': exam_id, 'start_clock': True}
         response = self.client.post(self.attempt_api_path, data=data, headers=self.post_headers)
         response_data = json.loads(response.text)
         self.attempt_id = response_data.get('exam_attempt_id')
@@ -37,6 +40,8 @@ class ProctoredExamTasks(LmsTasks):
         This mimics the polling that the banner of a timed exam or proctored exam performs.
         """
         attempt_id = self.attempt_id
+        if attempt_id is None:
+            return
 
         self.client.get(
             '{url}/{attempt_id}'.format(url=self.attempt_api_path, attempt_id=attempt_id),
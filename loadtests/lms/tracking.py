@@ -1,9 +1,9 @@
 import json
-from random import choice
-from string import ascii_letters, digits
-from locust import task
+
+from locust import events, task
 
 from base import LmsTasks
+from helpers import event_queue, payloads, settings, util
 
 # use the following insigts query to update AVERAGE_CONTENT_LENGTH:
 #
@@ -11,49 +11,124 @@ from base import LmsTasks
 #
 AVERAGE_CONTENT_LENGTH = 1606
 
+# This variable represents the approximate overhead of the data (in the form of
+# urlencoded POST parameters), i.e. the number of bytes in the request body
+# less the random string. This is roughly based on the number of characters in
+# the boilerplate data of TrackingTasks._event_data.
+APPROXIMATE_DATA_OVERHEAD = 270
+
 # user_track API endpoint.  Use this location for POSTing tracking event data.
 EVENT_API_PATH = '/event'
 
+# Path to POST batches of tracking events to, in batched mode.  Batched mode is
+# enabled by setting TRACKING_BATCH_API_PATH.
+BATCH_EVENT_API_PATH_SETTING = 'TRACKING_BATCH_API_PATH'
+
+# Batches are reported under this name, by number of events, so that the cost
+# per event can be compared across batch sizes and with EVENT_API_PATH.
+BATCH_REQUEST_NAME = 'tracking:batch [{} events]'
+
+# Distributions of the tracking event settings which are drawn at random, as
+# (setting name, default [value, ratio] pairs).
+CONTENT_LENGTHS = ('TRACKING_CONTENT_LENGTHS', [(AVERAGE_CONTENT_LENGTH, 1)])
+BATCH_SIZES = ('TRACKING_BATCH_SIZES', [(10, 1)])
+BATCH_INTERVALS = ('TRACKING_BATCH_INTERVALS', [(30, 1)])
+
+# Samplers built from the settings, keyed by setting name.
+_samplers = {}
+
+
+def _sample(distribution):
+    """
+    Draw a value from one of the distributions above.
+
+    The distribution is taken from the setting, a list of [value, ratio] pairs
+    (e.g. a histogram of real content lengths), and defaults to the given
+    pairs.  Each sampler is only built once per process.
+    """
+    setting, default = distribution
+    if setting not in _samplers:
+        _samplers[setting] = util.WeightedSampler([
+            (value, ratio) for value, ratio in settings.data.get(setting, default)
+        ])
+    return _samplers[setting].choice()
+
 
 class TrackingTasks(LmsTasks):
     """
     Tasks representing tracking events reported by ajax requests.
     """
 
-    def _random_simple_string(self, length):
-        # for simplicity, chars in this pool should be only 1 byte long in
-        # utf-8, and also won't expand into escapes when converting to json.
-        char_pool = ascii_letters + digits
-        random_chars = (choice(char_pool) for _ in xrange(length))
-        return ''.join(random_chars)
-
-    @task(9)
-    def report_event(self):
+    def _event_data(self):
         """
-        POST a user tracking event.  This simulates event reports such as
-        clicking the next button or jumping to a different secion.
+        Return the data of a random tracking event.
         """
-        # This variable represents the approximate overhead of the data (in the
-        # form of urlencoded POST parameters), i.e. the number of bytes in the
-        # request body less the random string. This is roughly based on the
-        # number of characters in the boilerplate data below.
-        approximate_data_overhead = 270
-        random_string_length = AVERAGE_CONTENT_LENGTH - approximate_data_overhead
-        random_string = self._random_simple_string(random_string_length)
+        content_length = _sample(CONTENT_LENGTHS)
+        random_string = payloads.random_simple_string(max(0, content_length - APPROXIMATE_DATA_OVERHEAD))
 
         # The contents of the parameters are not significant, we just want to
         # structure the data in a way that won't cause the LMS to error.
-        data = {
+        return {
             'event_type': 'fake_event_for_load_testing',
             'event': '{{ "description": "this random tracking data is generated by https://github.com/edx/edx-load-tests", "random_event_data": "{}" }}'.format(random_string),
             'page': '/courses/{}'.format(self.course_id),
         }
 
-        response = self.client.post(EVENT_API_PATH, data=data, headers=self.post_headers)
+    @task(9)
+    def report_event(self):
+        """
+        POST a user tracking event.  This simulates event reports such as
+        clicking the next button or jumping to a different secion.
+
+        In batched mode, the event is queued instead, like the event queue of
+        a browser does, and the queue is flushed as a single request once it
+        is full or old enough.
+        """
+        if settings.data.get(BATCH_EVENT_API_PATH_SETTING):
+            self._queue_event(self._event_data())
+        else:
+            self.client.post(EVENT_API_PATH, data=self._event_data(), headers=self.post_headers)
+
+    def _queue_event(self, event):
+        """
+        Queue a tracking event, to be flushed by the locust's EventQueue.
+
+        The queue is kept on the locust, so that events queued by one TaskSet
+        are flushed even after switching to another.  The size and maximum age
+        of each batch are drawn from the TRACKING_BATCH_SIZES and
+        TRACKING_BATCH_INTERVALS (in seconds) distributions.
+        """
+        if getattr(self.locust, '_tracking_queue', None) is None:
+            self.locust._tracking_queue = event_queue.EventQueue(
+                self._flush_events,
+                draw_size=lambda: _sample(BATCH_SIZES),
+                draw_interval=lambda: _sample(BATCH_INTERVALS),
+            )
+        self.locust._tracking_queue.put(event)
+
+    def _flush_events(self, batch):
+        """
+        POST a batch of tracking events as a single segment-style JSON array.
+        """
+        headers = self.post_headers
+        headers['Content-Type'] = 'application/json'
+        self.client.post(
+            settings.data[BATCH_EVENT_API_PATH_SETTING],
+            data=json.dumps({'batch': batch}),
+            headers=headers,
+            name=BATCH_REQUEST_NAME.format(len(batch)),
+        )
 
     @task(1)
     def stop(self):
         """
-        Switch to another TaskSet.
+        Switch to another TaskSet, flushing any queued tracking events first,
+        like a browser does when leaving a page.
         """
+        if getattr(self.locust, '_tracking_queue', None) is not None:
+            self.locust._tracking_queue.flush()
         self.interrupt()
+
+
+# Send the batches still queued when locust quits.
+events.quitting += event_queue.flush_all
@@ -26,7 +26,7 @@ from locust import HttpLocust, task, TaskSet
 import logging
 import random
 
-from helpers import settings
+from helpers import dummy_text, jwt_cache, settings
 # NOTE: the host URL passed in via command-line '--host' flag is the host of
 # the LMS!  Make sure to set the notes service URL via the NOTES_HOST setting.
 settings.init(__name__, required_data=[
@@ -48,20 +48,34 @@ from helpers.edx_app import EdxAppTasks
 HIGHLIGHT_TAG = 'span'
 HIGHLIGHT_CLASS = 'note-highlight'
 
+# Fetch a fresh notes JWT from the LMS once the cached one is within this many
+# seconds of expiring.
+TOKEN_REFRESH_MARGIN = settings.data.get('TOKEN_REFRESH_MARGIN', 60)
+
+# The notes JWTs of the users of this process.
+ANNOTATOR_AUTH_TOKENS = jwt_cache.JWTCache(TOKEN_REFRESH_MARGIN)
+
 # Internal constants
 DATA_DIRECTORY = os.path.join(os.path.dirname(__file__), 'notes_data/')
-with open(os.path.join(DATA_DIRECTORY, 'basic_words.txt')) as f:
-    NOTES_TEXT = [word for line in f for word in line.split()]
+NOTES_TEXT = dummy_text.load_corpus(os.path.join(DATA_DIRECTORY, 'basic_words.txt'))
 
 log = logging.getLogger(__name__)
 
 
-def pick_some(sequence, num_items):
+def pick_some(corpus, num_items):
+    """
+    Return a list of between 1 and `num_items` (inclusive) distinct words from
+    `corpus`.
+    """
+    return corpus.words(random.randint(1, num_items))
+
+
+def pick_some_text(corpus, num_items):
     """
-    Return a list of between 1 and `num_items` (inclusive) items from
-    `sequence`.
+    Return a string of between 1 and `num_items` (inclusive) distinct words
+    from `corpus`, separated by spaces.
     """
-    return random.sample(sequence, random.randint(1, num_items))
+    return corpus.phrase(random.randint(1, num_items))
 
 
 class BaseNotesTask(EdxAppTasks, EnrollmentTaskSetMixin):
@@ -95,11 +109,23 @@ class BaseNotesTask(EdxAppTasks, EnrollmentTaskSetMixin):
     def annotator_auth_token(self):
         """
         Get the JWT key for making requests to the notes service from the LMS.
+
+        The token is cached for the current user along with its expiration, and
+        is only fetched again once it is close to expiring.  Otherwise every
+        notes request would cost an additional LMS request.
         """
-        return self.client.get(
-            '/courses/{course_id}/edxnotes/token/'.format(course_id=self.course_id),
+        token = ANNOTATOR_AUTH_TOKENS.get(self._username)
+        if token is not None:
+            return token
+
+        path = '/courses/{course_id}/edxnotes/token/'
+        token = self.client.get(
+            path.format(course_id=self.course_id),
             headers={'content-type': 'text/plain'},
+            name=path.format(course_id='[course_id]'),
         ).content
+        ANNOTATOR_AUTH_TOKENS.save(self._username, token)
+        return token
 
     @contextmanager
     def get_posted_student_note(self, warning_message):
@@ -176,15 +202,15 @@ class BaseNotesTask(EdxAppTasks, EnrollmentTaskSetMixin):
         data = {
             'user': self._anonymous_user_id,
             'course_id': self.course_id,
-            'text': ' '.join(pick_some(
+            'text': pick_some_text(
                 NOTES_TEXT,
                 settings.data['NUM_WORDS'],
-            )),
+            ),
             'tags': pick_some(
                 NOTES_TEXT,
                 settings.data['NUM_TAGS'],
             ),
-            'quote': ' '.join(pick_some(NOTES_TEXT, 5)),
+            'quote': pick_some_text(NOTES_TEXT, 5),
             'usage_id': self.course_data.html_usage_id,
             'ranges': [
                 {
@@ -221,10 +247,10 @@ class BaseNotesTask(EdxAppTasks, EnrollmentTaskSetMixin):
         """
         collection_path = '/api/v1/annotations/'
         with self.get_posted_student_note('No notes left to edit.') as note:
-            note['text'] = ' '.join(pick_some(
+            note['text'] = pick_some_text(
                 NOTES_TEXT,
                 settings.data['NUM_WORDS'],
-            ))
+            )
             self.put(collection_path + note['id'], note, name=collection_path + '[id]')
             self._notes[note['id']] = note
 
@@ -241,10 +267,10 @@ class BaseNotesTask(EdxAppTasks, EnrollmentTaskSetMixin):
         """
         path = '/courses/{course_id}/edxnotes/notes/'.format(course_id=self.course_id)
         params = {
-            'text': ' '.join(pick_some(
+            'text': pick_some_text(
                 NOTES_TEXT,
                 settings.data['NUM_SEARCH_TERMS'],
-            )),
+            ),
         }
         # Custom name ensures searches are grouped together in locust results.
         self.client.get(path, params=params, name=path + '?text=[search_text]', verify=False)
@@ -367,10 +393,10 @@ class SearchApiNotesTasks(BaseNotesTask):
             {
                 'user': self._anonymous_user_id,
                 'course_id': self.course_id,
-                'text': ' '.join(pick_some(
+                'text': pick_some_text(
                     NOTES_TEXT,
                     settings.data['NUM_SEARCH_TERMS'],
-                )),
+                ),
                 'highlight': True,
                 'highlight_tag': HIGHLIGHT_TAG,
                 'highlight_class': HIGHLIGHT_CLASS
@@ -12,10 +12,9 @@ from collections import deque
 import requests.exceptions
 import json
 import random
-import string
 from locust import HttpLocust, task
 from helpers.auto_auth_tasks import AutoAuthTasks
-from helpers import settings, markers
+from helpers import dummy_text, settings, markers
 import logging
 
 # make sure all the retries appear in the log
@@ -31,8 +30,6 @@ settings.init(__name__, required_data=[
 
 markers.install_event_markers()
 
-_dummy_chars = string.lowercase + ' '
-
 
 class TeamFullException(Exception):
     """
@@ -52,13 +49,6 @@ def join_team_giveup_handler(details):
     raise RuntimeError('Check that there are enough open memberships among the teams.')
 
 
-def _dummy_text(minlen, maxlen):
-    """
-    Generate dummy text for forum submissions.
-    """
-    return "".join(random.choice(_dummy_chars) for _ in xrange(minlen, random.randrange(minlen + 1, maxlen)))
-
-
 class TeamsDiscussionTasks(AutoAuthTasks):
     """
     Tests that post to team discussions.
@@ -189,8 +179,8 @@ class TeamsDiscussionTasks(AutoAuthTasks):
     def create_thread(self):
         """ Create a thread in the team's discussion. """
         thread_data = {
-            'body': _dummy_text(100, 2000),  # NB size range not based on actual data.
-            'title': _dummy_text(20, 100),  # NB size range not based on actual data.
+            'body': dummy_text.dummy_text(100, 2000),  # NB size range not based on actual data.
+            'title': dummy_text.dummy_text(20, 100),  # NB size range not based on actual data.
             'thread_type': random.choice(('discussion', 'question')),
             'anonymous_to_peers': 'false',
             'anonymous': 'false',
@@ -219,7 +209,7 @@ class TeamsDiscussionTasks(AutoAuthTasks):
         _, thread_id = random.choice(self._thread_ids)
 
         thread_data = {
-            'body': _dummy_text(100, 2000)
+            'body': dummy_text.dummy_text(100, 2000)
         }
 
         url = '/courses/{course_id}/discussion/threads/{thread_id}/reply'
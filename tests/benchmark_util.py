@@ -0,0 +1,33 @@
+"""
+Micro-benchmark of the weighted choice utilities in helpers.util.
+
+This is not collected by pytest.  Run it from the root of edx-load-tests:
+
+    python -m tests.benchmark_util
+"""
+import random
+import timeit
+
+from helpers.util import WeightedSampler, choice_with_distribution
+
+NUMBER = 10000
+
+
+def main():
+    for size in (2, 10, 100, 1000):
+        pairs = [('element{}'.format(i), random.randint(1, 100)) for i in xrange(size)]
+        sampler = WeightedSampler(pairs)
+        timings = [
+            ('choice_with_distribution', lambda: choice_with_distribution(pairs)),
+            ('WeightedSampler.choice', sampler.choice),
+            ('WeightedSampler.sample', lambda: sampler.sample(NUMBER)),
+        ]
+        for name, func in timings:
+            # sample() makes NUMBER choices per call, the others make one.
+            number = 1 if name.endswith('sample') else NUMBER
+            seconds = min(timeit.repeat(func, number=number, repeat=3))
+            print '{:>5} elements  {:<26} {:8.3f} us/choice'.format(size, name, seconds * 1e6 / NUMBER)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Test functions in helpers.admission"""
+
+import time
+
+import gevent
+from locust import events
+
+from helpers import admission
+
+
+def _record_requests():
+    """
+    Return the list of the names of the requests reported to locust from now
+    on, and the handler to remove once done.
+    """
+    names = []
+
+    def handler(name, **kwargs):
+        names.append(name)
+    events.request_success += handler
+    return names, handler
+
+
+def test_rate_limit():
+    """
+    Once the burst is used up, setup steps should be started at the rate.
+    """
+    controller = admission.AdmissionController(rate=50, burst=1)
+    start = time.time()
+    for __ in range(11):
+        controller.run('step', lambda: True)
+    # The first step uses the burst, and the next ten wait 20ms each.
+    assert 0.19 <= time.time() - start < 0.5
+
+
+def test_concurrency_limit():
+    """
+    No more than max_concurrent setup steps should run at once.
+    """
+    controller = admission.AdmissionController(max_concurrent=2)
+    running = []
+    most_running = []
+
+    def step():
+        running.append(1)
+        most_running.append(len(running))
+        gevent.sleep(0.01)
+        running.pop()
+        return True
+
+    gevent.joinall([gevent.spawn(controller.run, 'step', step) for __ in range(6)])
+    assert max(most_running) == 2
+
+
+def test_admission_wait_only_reported_when_limited():
+    """
+    The time waiting to be admitted should only be reported if there is a
+    limit to wait for.
+    """
+    names, handler = _record_requests()
+    try:
+        admission.AdmissionController().run('step', lambda: True)
+        assert names == ['step']
+
+        del names[:]
+        admission.AdmissionController(max_concurrent=1).run('step', lambda: True)
+        assert names == ['admission_wait', 'step']
+    finally:
+        events.request_success -= handler
+
+
+def test_backoff_delay():
+    """
+    The delay should be at most base after the first failure, doubling after
+    each failure, up to cap.
+    """
+    assert admission.backoff_delay(0) == 0
+    for failures, limit in [(1, 1.0), (2, 2.0), (3, 4.0), (10, 60.0), (100, 60.0)]:
+        delays = [admission.backoff_delay(failures, base=1.0, cap=60.0) for __ in range(200)]
+        assert all(0 <= delay <= limit for delay in delays)
+        assert max(delays) > limit / 2
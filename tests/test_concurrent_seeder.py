@@ -0,0 +1,58 @@
+"""Test functions in loadtests.discussions_api.seed_data.concurrent_seeder"""
+
+import os
+import sys
+
+import pytest
+
+# Import the seeder the way seed_data scripts are run, from their own
+# directory, rather than through loadtests.discussions_api, whose __init__
+# loads the discussions_api locustfile.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'loadtests', 'discussions_api', 'seed_data'))
+
+from concurrent_seeder import Checkpoint, ConcurrentSeeder, PageReadException  # noqa
+
+
+class FlakySeeder(ConcurrentSeeder):
+    """
+    Reads pages of 2 threads from a course with 4 pages, failing to read the
+    pages in fail_pages.
+    """
+
+    def __init__(self, fail_pages=()):
+        super(FlakySeeder, self).__init__(seeder=None, workers=2)
+        self.fail_pages = set(fail_pages)
+        self.pages_read = []
+
+    def _get_thread_page(self, course_id, page):
+        if page in self.fail_pages:
+            raise PageReadException("Page {}: 500".format(page))
+        self.pages_read.append(page)
+        return {
+            'pagination': {'num_pages': 4},
+            'results': [{'id': 'thread{}_{}'.format(page, index)} for index in range(2)],
+        }
+
+
+def test_dump_course_threads_resume(tmpdir):
+    """
+    A dump interrupted by a page which can't be read should keep the pages read
+    so far, and only read the other pages when run again.
+    """
+    file_name = str(tmpdir.join('threads'))
+    with pytest.raises(PageReadException):
+        FlakySeeder(fail_pages=[3]).dump_course_threads('course', file_name)
+    # Pages are read concurrently, so page 2 or 4 may not have come back yet.
+    pages_written = Checkpoint(file_name).pages
+    assert 1 in pages_written
+    assert 3 not in pages_written
+
+    seeder = FlakySeeder()
+    seeder.dump_course_threads('course', file_name)
+    # The first page is always read, for the number of pages.
+    assert sorted(seeder.pages_read) == sorted({1} | ({2, 3, 4} - pages_written))
+    with open(file_name) as threads_file:
+        thread_ids = threads_file.read().split()
+    assert sorted(thread_ids) == ['thread{}_{}'.format(page, index) for page in range(1, 5) for index in range(2)]
+    assert not os.path.exists(file_name + '.checkpoint')
@@ -0,0 +1,65 @@
+"""Test functions in helpers.course_data"""
+
+import pytest
+from helpers.course_data import CourseData, FrozenCourseData
+
+COURSE = {
+    'capa_problems': {
+        'problem1': {
+            'inputs': {'_2_1': ['a'], '_3_1': ('b',)},
+        },
+    },
+}
+
+
+def test_capa_submission():
+    """
+    The compiled form should give out the same submissions as CourseData.
+    """
+    expected = ('problem1', COURSE['capa_problems']['problem1'], {
+        'input_i4x-edX-DemoX-problem-problem1_2_1': 'a',
+        'input_i4x-edX-DemoX-problem-problem1_3_1': 'b',
+    })
+    assert CourseData(COURSE).for_course('edX', 'DemoX').capa_submission == expected
+    assert FrozenCourseData(COURSE).for_course('edX', 'DemoX').capa_submission == expected
+    assert FrozenCourseData(COURSE).capa_problem == CourseData(COURSE).capa_problem
+
+
+def test_capa_submission_unbound():
+    """
+    Submissions should need course data bound to a course.
+    """
+    with pytest.raises(TypeError):
+        CourseData(COURSE).capa_submission
+    with pytest.raises(TypeError):
+        FrozenCourseData(COURSE).capa_submission
+
+
+def test_for_course():
+    """
+    FrozenCourseData should be bound to each course once.
+    """
+    data = FrozenCourseData(COURSE)
+    assert data.for_course('edX', 'DemoX') is data.for_course('edX', 'DemoX')
+    assert data.for_course('edX', 'DemoX') is not data.for_course('edX', 'Other')
+    assert data.for_course('edX', 'DemoX')['capa_problems'] == COURSE['capa_problems']
+
+
+def test_frozen():
+    """
+    FrozenCourseData should not be modified after it has been compiled.
+    """
+    data = FrozenCourseData(COURSE)
+    with pytest.raises(TypeError):
+        data['capa_problems'] = {}
+    with pytest.raises(TypeError):
+        data.update(video_ids=())
+
+
+def test_exam_id():
+    """
+    Course data without special exams should have no exam id.
+    """
+    assert CourseData(COURSE).exam_id is None
+    assert CourseData(COURSE, special_exam_ids=()).exam_id is None
+    assert CourseData(COURSE, special_exam_ids=(12,)).exam_id == 12
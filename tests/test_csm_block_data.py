@@ -0,0 +1,121 @@
+"""Test functions in loadtests.csm.block_data and loadtests.csm.sqlite_backend"""
+
+import imp
+import json
+import os
+import sys
+
+import numpy
+from opaque_keys.edx.locator import CourseLocator
+
+# The csm modules import each other as the "csm" package, whose __init__ loads
+# the csm locustfile along with its settings; register the package without
+# running it.
+if 'csm' not in sys.modules:
+    _csm = imp.new_module('csm')
+    _csm.__path__ = [os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'loadtests', 'csm')]
+    sys.modules['csm'] = _csm
+
+from csm.block_data import BatchSampler, block_count_class, block_data, size_class  # noqa
+from csm.sqlite_backend import SQLiteDatabase, SQLiteUserStateClient  # noqa
+
+
+def _usage_keys(count):
+    course_key = CourseLocator('org', 'course', 'run')
+    return [course_key.make_usage_key('problem', 'block{}'.format(index)) for index in range(count)]
+
+
+def test_batch_sampler():
+    """
+    Values should be handed out in order, drawing a new batch only once the
+    last one is used up, and from the new draw after a reset.
+    """
+    calls = []
+
+    def draw(count):
+        calls.append(count)
+        return numpy.arange(len(calls) * 10, len(calls) * 10 + count)
+
+    sampler = BatchSampler(draw, batch_size=3)
+    assert [sampler.next() for __ in range(4)] == [10, 11, 12, 20]
+    assert calls == [3, 3]
+
+    sampler.reset()
+    assert sampler.next() == 30
+    assert len(calls) == 3
+
+    sampler.reset(lambda count: numpy.zeros(count, dtype=int))
+    assert [sampler.next() for __ in range(4)] == [0, 0, 0, 0]
+    assert len(calls) == 3
+
+
+def test_block_data():
+    """
+    Block states should serialize to about the requested size: within the
+    few characters of syntax per field that block_data doesn't account for.
+    """
+    assert block_data(2, 3) == {}
+    for size, num_fields in ((30, 3), (300, 3), (4000, 1), (65000, 10)):
+        state = block_data(size, num_fields)
+        assert len(state) == num_fields
+        assert abs(len(json.dumps(state)) - size) <= 4 * num_fields
+
+
+def test_size_class():
+    assert size_class(1) == '<=64B'
+    assert size_class(64) == '<=64B'
+    assert size_class(65) == '<=256B'
+    assert size_class(1024) == '<=1KB'
+    assert size_class(1025) == '<=4KB'
+    assert size_class(65536) == '<=64KB'
+    assert size_class(65537) == '>64KB'
+
+
+def test_block_count_class():
+    assert block_count_class(1) == '1 block'
+    assert block_count_class(2) == '2 blocks'
+    assert block_count_class(3) == '3-4 blocks'
+    assert block_count_class(4) == '3-4 blocks'
+    assert block_count_class(5) == '5-8 blocks'
+    assert block_count_class(8) == '5-8 blocks'
+    assert block_count_class(9) == '9-16 blocks'
+    assert block_count_class(1024) == '513-1024 blocks'
+
+
+def test_sqlite_round_trip():
+    """
+    State should be created, merged on update and read back, for the client's
+    user only.
+    """
+    database = SQLiteDatabase()
+    client = SQLiteUserStateClient(database, database.create_user('alice'))
+    other = SQLiteUserStateClient(database, database.create_user('bob'))
+    keys = _usage_keys(3)
+
+    client.set_many('alice', {keys[0]: {'a': 1}, keys[1]: {'b': 2}})
+    other.set_many('bob', {keys[0]: {'a': 'bob'}})
+    client.set_many('alice', {keys[1]: {'c': 3}, keys[2]: {'d': 4}})
+
+    states = {state.block_key: state.state for state in client.get_many('alice', keys)}
+    assert states == {keys[0]: {'a': 1}, keys[1]: {'b': 2, 'c': 3}, keys[2]: {'d': 4}}
+    assert all(state.username == 'alice' for state in client.get_many('alice', keys))
+
+    states = {state.block_key: state.state for state in client.get_many('alice', keys, fields=['b', 'd'])}
+    assert states == {keys[0]: {}, keys[1]: {'b': 2}, keys[2]: {'d': 4}}
+
+    assert [state.state for state in other.get_many('bob', keys)] == [{'a': 'bob'}]
+
+
+def test_sqlite_bulk_create():
+    """
+    Blocks created in bulk should read back like those created one by one.
+    """
+    database = SQLiteDatabase()
+    client = SQLiteUserStateClient(database, database.create_user('alice'))
+    keys = _usage_keys(3)
+
+    assert client.bulk_create('alice', {keys[0]: {'a': 1}, keys[1]: {'b': 2}}) is True
+    client.set_many('alice', {keys[1]: {'c': 3}})
+
+    states = {state.block_key: state.state for state in client.get_many('alice', keys)}
+    assert states == {keys[0]: {'a': 1}, keys[1]: {'b': 2, 'c': 3}}
@@ -0,0 +1,55 @@
+"""Test functions in helpers.dummy_text"""
+
+import pytest
+from helpers.dummy_text import WordCorpus, dummy_text, random_word
+
+WORDS = ['alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot']
+
+
+def test_text_length():
+    """
+    Text should be within the requested length, and start at a word boundary.
+    """
+    corpus = WordCorpus(WORDS)
+    for __ in xrange(100):
+        text = corpus.text(5, 20)
+        assert 5 <= len(text) < 20
+        assert text.split(' ')[0] in WORDS
+    with pytest.raises(ValueError):
+        corpus.text(100, 200)
+
+
+def test_words():
+    """
+    Words should be whole, distinct words of the corpus.
+    """
+    corpus = WordCorpus(WORDS)
+    assert corpus.word() in WORDS
+    assert sorted(corpus.words(len(WORDS))) == sorted(WORDS)
+    assert corpus.phrase(1) in WORDS
+    assert len(set(corpus.words(3)) & set(WORDS)) == 3
+
+
+def test_default_corpus():
+    assert ' ' not in random_word()
+    assert 100 <= len(dummy_text(100, 2000)) < 2000
+
+
+def test_phrases_are_not_runs_of_the_corpus():
+    """
+    Phrases should combine words from anywhere in the corpus, not only those
+    next to each other.
+    """
+    corpus = WordCorpus(WORDS, seed=0)
+    phrases = set(corpus.phrase(2) for __ in xrange(500))
+    # 6 * 5 ordered pairs of distinct words, against 5 runs of two words.
+    assert len(phrases) > 5
+
+
+def test_shuffle_seed():
+    """
+    The order of the corpus should only be fixed when a seed is given.
+    """
+    assert WordCorpus(WORDS, seed=1).corpus == WordCorpus(WORDS, seed=1).corpus
+    orders = set(WordCorpus(WORDS).corpus for __ in xrange(20))
+    assert len(orders) > 1
@@ -0,0 +1,75 @@
+"""Test functions in helpers.event_queue"""
+
+import gevent
+
+from helpers import event_queue
+
+
+def _queue(size, interval):
+    batches = []
+    return event_queue.EventQueue(batches.append, lambda: size, lambda: interval), batches
+
+
+def test_size_flush():
+    """
+    A batch should be sent as soon as it is full, and the next one started
+    afresh.
+    """
+    queue, batches = _queue(size=3, interval=60)
+    for event in range(7):
+        queue.put(event)
+    assert batches == [[0, 1, 2], [3, 4, 5]]
+    assert len(queue) == 1
+    queue.flush()
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_deadline_flush():
+    """
+    A batch should be sent once its first event has been queued for the
+    interval, even if no more events are queued.
+    """
+    queue, batches = _queue(size=10, interval=0.01)
+    queue.put(0)
+    queue.put(1)
+    gevent.sleep(0.05)
+    assert batches == [[0, 1]]
+
+    queue.put(2)
+    assert batches == [[0, 1]]
+    gevent.sleep(0.05)
+    assert batches == [[0, 1], [2]]
+
+
+def test_flush_cancels_deadline():
+    """
+    Flushing a batch early should stop its deadline from sending the next
+    one before its own.
+    """
+    queue, batches = _queue(size=2, interval=0.1)
+    queue.put(0)
+    queue.put(1)
+    gevent.sleep(0.05)
+    queue.put(2)
+    gevent.sleep(0.08)
+    assert batches == [[0, 1]]
+    gevent.sleep(0.1)
+    assert batches == [[0, 1], [2]]
+
+    queue.flush()
+    assert batches == [[0, 1], [2]]
+
+
+def test_flush_all():
+    """
+    flush_all should send the batches of every queue with queued events.
+    """
+    queue1, batches1 = _queue(size=10, interval=60)
+    queue2, batches2 = _queue(size=10, interval=60)
+    queue1.put(0)
+    queue2.put(1)
+    queue2.flush()
+    event_queue.flush_all()
+    assert batches1 == [[0]]
+    assert batches2 == [[1]]
+    assert not event_queue._pending  # pylint: disable=protected-access
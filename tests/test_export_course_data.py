@@ -0,0 +1,41 @@
+"""Test functions in util.export_course_data"""
+
+from xml.etree import cElementTree as ElementTree
+
+from util.export_course_data import CourseExport, capa_inputs
+
+PROBLEM = """
+<problem>
+    <multiplechoiceresponse>
+        <choicegroup><choice correct="false">a</choice><choice correct="true">b</choice></choicegroup>
+    </multiplechoiceresponse>
+    <choiceresponse><checkboxgroup><choice>c</choice></checkboxgroup></choiceresponse>
+    <optionresponse><optioninput options="('red','blue')"/></optionresponse>
+    <numericalresponse answer="3.14"><formulaequationinput/></numericalresponse>
+    <customresponse><textline/></customresponse>
+</problem>
+"""
+
+
+def test_capa_inputs():
+    """
+    Inputs should be numbered like capa does, and unanswerable ones skipped.
+    """
+    assert capa_inputs(ElementTree.fromstring(PROBLEM)) == {
+        '_2_1': ['choice_0', 'choice_1'],
+        '_3_1[]': ['choice_0'],
+        '_4_1': ['red', 'blue'],
+        '_5_1': ['3.14'],
+    }
+
+
+def test_special_exam_ids():
+    """
+    The course data should hold the special exam ids given, under the key read
+    by CourseData.exam_id.
+    """
+    export = CourseExport()
+    export._read_sequential('exam', ElementTree.fromstring('<sequential is_time_limited="true"/>'))
+    assert export.special_exam_sequential_ids == ['exam']
+    assert export.course_data()['special_exam_ids'] == ()
+    assert export.course_data([12, 13])['special_exam_ids'] == (12, 13)
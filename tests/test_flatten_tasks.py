@@ -0,0 +1,98 @@
+"""Test functions in helpers.flatten_tasks"""
+
+import pytest
+from helpers.flatten_tasks import _flat_task, flat_task_weights
+
+
+def _task(name):
+    def task(self):
+        pass
+    task.__name__ = name
+    return task
+
+
+own_task = _task('own_task')
+read = _task('read')
+write = _task('write')
+stop = _task('stop')
+
+
+class ChildA(object):
+    tasks = [read] * 3 + [write] + [stop] * 4
+
+
+class ChildB(object):
+    tasks = [write, stop]
+
+
+class Parent(object):
+    tasks = [ChildA] * 2 + [ChildB] + [own_task]
+
+
+def test_flat_task_weights():
+    """
+    The weight of each task of a child TaskSet should be the share of the child
+    in its parent times the share of the task in the child, ignoring "stop".
+    """
+    weights = {(child, task): weight for child, task, weight in flat_task_weights(Parent)}
+    assert weights == {
+        (ChildA, read): pytest.approx(0.5 * 0.75),
+        (ChildA, write): pytest.approx(0.5 * 0.25),
+        (ChildB, write): pytest.approx(0.25),
+        (None, own_task): pytest.approx(0.25),
+    }
+
+
+class _TaskSet(object):
+    """
+    The parts of a locust TaskSet used by flattened tasks.
+    """
+
+    def __init__(self, parent):
+        self.parent = parent
+        self.calls = []
+
+    def execute_task(self, task):
+        task(self)
+
+
+def _recording_task(self):
+    self.calls.append('task')
+
+
+class Unreliable(_TaskSet):
+    """
+    A child TaskSet whose on_start fails the first time.
+    """
+    starts = 0
+
+    def on_start(self):
+        Unreliable.starts += 1
+        if Unreliable.starts == 1:
+            raise ValueError('setup failed')
+
+    def ensure_setup(self):
+        self.calls.append('ensure_setup')
+
+
+def test_flat_task_setup():
+    """
+    A failed on_start should be raised once, then the child's tasks skipped
+    until the backoff delay is over.  Once set up, ensure_setup should run
+    before each task.
+    """
+    parent = _TaskSet(None)
+    flat_task = _flat_task(Unreliable, _recording_task)
+
+    with pytest.raises(ValueError):
+        flat_task(parent)
+    flat_task(parent)
+    assert Unreliable.starts == 1
+
+    # Skip the backoff delay.
+    parent._flat_setup_failures[Unreliable] = (1, 0)
+    flat_task(parent)
+    flat_task(parent)
+    assert Unreliable.starts == 2
+    assert parent._flat_children[Unreliable].calls == ['ensure_setup', 'task', 'ensure_setup', 'task']
+    assert parent._flat_setup_failures == {}
@@ -0,0 +1,108 @@
+"""Test functions in helpers.import_timeline"""
+
+from helpers import import_timeline
+
+
+def test_stage_durations():
+    """
+    Each stage should last from when it was first seen until the next one.
+    """
+    transitions = [(0, 10.0), (1, 10.5), (2, 13.0), (3, 14.0), (4, 20.0)]
+    assert import_timeline.stage_durations(transitions) == [
+        ('no status', 0.5, True),
+        ('unpacking', 2.5, True),
+        ('verifying', 1.0, True),
+        ('updating', 6.0, True),
+    ]
+
+
+def test_stage_durations_failure():
+    """
+    The stage an import failed in should not be successful.
+    """
+    transitions = [(1, 0.0), (2, 1.0), (-2, 3.0)]
+    assert import_timeline.stage_durations(transitions) == [
+        ('unpacking', 1.0, True),
+        ('verifying', 2.0, False),
+    ]
+
+
+def test_stage_durations_unseen_failure():
+    """
+    A stage which failed before it was seen running should still be recorded
+    as failed.
+    """
+    transitions = [(0, 0.0), (1, 2.0), (-2, 5.0)]
+    assert import_timeline.stage_durations(transitions) == [
+        ('no status', 2.0, True),
+        ('unpacking', 3.0, True),
+        ('verifying', 0.0, False),
+    ]
+    assert import_timeline.stage_durations([(-1, 1.0)]) == [('unpacking', 0.0, False)]
+
+
+def test_stage_durations_timeout():
+    """
+    The stage still running when the import timed out should be recorded as
+    failed, lasting until the end time, unlike stages of finished imports.
+    """
+    assert import_timeline.stage_durations([(1, 0.0), (3, 2.0)], end_time=10.0) == [
+        ('unpacking', 2.0, True),
+        ('updating', 8.0, False),
+    ]
+    assert import_timeline.stage_durations([(3, 2.0), (4, 5.0)], end_time=10.0) == [('updating', 3.0, True)]
+    assert import_timeline.stage_durations([(2, 0.0), (-2, 4.0)], end_time=10.0) == [('verifying', 4.0, False)]
+
+
+def test_stage_durations_status_lost():
+    """
+    A status going back to 0 should end the import, with the last stage seen
+    recorded as failed, rather than starting a stage.
+    """
+    transitions = [(0, 0.0), (1, 1.0), (3, 2.0), (0, 6.0)]
+    assert import_timeline.stage_durations(transitions, end_time=7.0) == [
+        ('no status', 1.0, True),
+        ('unpacking', 1.0, True),
+        ('updating', 4.0, False),
+    ]
+
+
+def test_import_ended():
+    """
+    Sampling should stop on success, failure or a lost status, but not while
+    no status has been seen yet.
+    """
+    assert not import_timeline.import_ended([])
+    assert not import_timeline.import_ended([(0, 0.0)])
+    assert not import_timeline.import_ended([(0, 0.0), (2, 1.0)])
+    assert import_timeline.import_ended([(0, 0.0), (4, 1.0)])
+    assert import_timeline.import_ended([(1, 0.0), (-1, 1.0)])
+    assert import_timeline.import_ended([(1, 0.0), (0, 1.0)])
+    assert import_timeline.status_lost([(1, 0.0), (0, 1.0)])
+    assert not import_timeline.status_lost([(0, 0.0)])
+
+
+def test_parse_logfile_stage_durations():
+    """
+    Stage durations should be parsed from the lines logged by
+    log_stage_durations, and only from those.
+    """
+    line = (
+        '[2017-01-01 00:00:00,000] host/INFO/helpers.import_timeline: '
+        'course import stages: [["unpacking", 1.5, true], ["verifying", 2.0, false]]'
+    )
+    assert import_timeline.parse_logfile_stage_durations(line) == [('unpacking', 1.5, True), ('verifying', 2.0, False)]
+    assert import_timeline.parse_logfile_stage_durations(
+        '[2017-01-01 00:00:00,000] host/INFO/helpers.markers: locust event: quitting'
+    ) is None
+
+
+def test_summarize():
+    """
+    The summary should give the percentiles of each stage, in stage order.
+    """
+    all_durations = [[('updating', float(i), True), ('unpacking', 1.0, i != 1)] for i in range(1, 21)]
+    assert import_timeline.summarize(all_durations) == [
+        {'stage': 'unpacking', 'count': 20, 'failures': 1, 'p50': 1.0, 'p95': 1.0},
+        {'stage': 'updating', 'count': 20, 'failures': 0, 'p50': 10.0, 'p95': 19.0},
+    ]
@@ -0,0 +1,55 @@
+"""Test functions in helpers.jwt_cache"""
+
+import base64
+import json
+
+from helpers.jwt_cache import JWTCache, jwt_expiration
+
+
+def _token(claims):
+    payload = base64.urlsafe_b64encode(json.dumps(claims)).rstrip('=')
+    return 'eyJhbGciOiJIUzI1NiJ9.{}.signature'.format(payload)
+
+
+def test_jwt_expiration():
+    """
+    The expiration should be read from unpadded payloads of any length, and
+    be None for tokens which can't be decoded.
+    """
+    for username in ('a', 'ab', 'abc', 'abcd'):
+        assert jwt_expiration(_token({'exp': 1500000000, 'sub': username})) == 1500000000
+    assert jwt_expiration(_token({'sub': 'a'})) is None
+    assert jwt_expiration('not a token') is None
+    assert jwt_expiration('a.!!!.c') is None
+    assert jwt_expiration('a.{}.c'.format(base64.urlsafe_b64encode('[1]'))) is None
+
+
+def test_refresh_margin():
+    """
+    Tokens should be reused until they are within the refresh margin of
+    expiring.
+    """
+    cache = JWTCache(refresh_margin=60)
+    token = _token({'exp': 1000})
+    cache.save('user1', token, now=100)
+    assert cache.get('user1', now=100) == token
+    assert cache.get('user1', now=939) == token
+    assert cache.get('user1', now=940) is None
+    assert cache.get('user2', now=100) is None
+
+
+def test_save():
+    """
+    Tokens without an expiration should not be cached, and saving should
+    replace the user's token and drop the stale tokens of other users.
+    """
+    cache = JWTCache(refresh_margin=60)
+    cache.save('user1', 'not a token', now=100)
+    assert cache.get('user1', now=100) is None
+
+    cache.save('user1', _token({'exp': 500}), now=100)
+    cache.save('user2', _token({'exp': 2000}), now=100)
+    new_token = _token({'exp': 3000})
+    cache.save('user2', new_token, now=1000)
+    assert cache.get('user2', now=1000) == new_token
+    assert cache._tokens.keys() == ['user2']  # pylint: disable=protected-access
@@ -0,0 +1,57 @@
+"""Test functions in loadtests.discussions_api.seed_data.mongo_seeder"""
+
+import datetime
+import os
+import sys
+
+# Import the seeder the way seed_data scripts are run, from their own
+# directory, rather than through loadtests.discussions_api, whose __init__
+# loads the discussions_api locustfile.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'loadtests', 'discussions_api', 'seed_data'))
+
+from mongo_seeder import MongoSeeder, contents_indexes  # noqa
+
+
+def test_contents_indexes():
+    """
+    The indexes of the contents collection should be read from
+    create_indexes.js, keeping the order of their keys.
+    """
+    indexes = {index.document['name']: index.document for index in contents_indexes()}
+    assert '_id_' not in indexes
+    assert len(indexes) == 22
+    index = indexes['_type_1_course_id_1_pinned_-1_created_at_-1']
+    assert list(index['key'].items()) == [('_type', 1), ('course_id', 1), ('pinned', -1), ('created_at', -1)]
+    assert index['background'] is True
+    assert indexes['comment_thread_id_1_sk_1']['sparse'] is True
+
+
+def test_thread_documents():
+    """
+    A thread should be followed by its responses, each with its comments, all
+    pointing back to the thread.
+    """
+    seeder = MongoSeeder('course-v1:testX+C1+2016_C1', 3, 'staff')
+    created_at = datetime.datetime(2017, 1, 1)
+    thread, response, comment, __, second_response, __, __ = seeder.thread_documents(2, 2, created_at)
+
+    assert thread['_type'] == 'CommentThread'
+    assert thread['comment_count'] == 6
+    assert thread['author_id'] == '3'
+    assert response['comment_thread_id'] == thread['_id']
+    assert response['child_count'] == 2
+    assert response['sk'] == str(response['_id'])
+    assert comment['parent_ids'] == [response['_id']]
+    assert comment['sk'] == '{}-{}'.format(response['_id'], comment['_id'])
+    assert second_response['parent_ids'] == []
+
+
+def test_threads_are_ordered():
+    """
+    Threads should be created one second apart, in order.
+    """
+    seeder = MongoSeeder('course-v1:testX+C1+2016_C1', 3, 'staff', start_time=datetime.datetime(2017, 1, 1))
+    created_ats = [documents[0]['created_at'] for documents in seeder.threads(3, 0, 0)]
+    assert created_ats == sorted(created_ats)
+    assert created_ats[-1] == datetime.datetime(2016, 12, 31, 23, 59, 59)
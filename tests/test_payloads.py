@@ -0,0 +1,22 @@
+"""Test functions in helpers.payloads"""
+
+import pytest
+from helpers.payloads import SIMPLE_CHARS, RandomStringBuffer, random_simple_string
+
+
+def test_random_string_buffer():
+    """
+    Strings cut from the buffer should have the requested length, and only
+    contain simple characters.
+    """
+    random_buffer = RandomStringBuffer(size=100)
+    for length in (0, 1, 50, 100):
+        random_string = random_buffer.get(length)
+        assert len(random_string) == length
+        assert set(random_string) <= set(SIMPLE_CHARS)
+    with pytest.raises(ValueError):
+        random_buffer.get(101)
+
+
+def test_random_simple_string():
+    assert len(random_simple_string(1336)) == 1336
@@ -0,0 +1,35 @@
+"""Test functions in helpers.session_cache"""
+
+from helpers.session_cache import SessionCache
+
+
+def test_save_and_load(tmpdir):
+    """
+    Saved session cookies should be loaded back, ignoring unrelated cookies.
+    """
+    cache = SessionCache(str(tmpdir.join('sessions')))
+    cache.save('user/1', {'sessionid': 'abc', 'csrftoken': 'def', 'other': 'ghi'})
+    assert cache.load('user/1') == {'sessionid': 'abc', 'csrftoken': 'def'}
+    assert cache.load('user2') is None
+
+
+def test_save_without_session(tmpdir):
+    """
+    Cookies without a sessionid are not a logged in session, and should not be
+    saved.
+    """
+    cache = SessionCache(str(tmpdir))
+    cache.save('user1', {'csrftoken': 'def'})
+    assert cache.load('user1') is None
+
+
+def test_discard(tmpdir):
+    """
+    A discarded session should no longer be loaded, and discarding a missing
+    session should do nothing.
+    """
+    cache = SessionCache(str(tmpdir))
+    cache.save('user1', {'sessionid': 'abc'})
+    cache.discard('user1')
+    assert cache.load('user1') is None
+    cache.discard('user1')
@@ -0,0 +1,68 @@
+"""Test functions in helpers.user_pool"""
+
+import pytest
+from helpers.user_pool import UserPool, UserPoolError
+
+
+def _user(num):
+    return {
+        'username': 'user{}'.format(num),
+        'email': 'user{}@example.com'.format(num),
+        'password': 'password{}'.format(num),
+        'user_id': str(num),
+        'anonymous_id': 'anon{}'.format(num),
+    }
+
+
+def test_append_and_read(tmpdir):
+    """
+    Users appended across several calls (e.g. a resumed pool creation) should
+    all be read back, in order, with a single header row.
+    """
+    pool_filename = str(tmpdir.join('users.csv'))
+    pool = UserPool(pool_filename)
+    assert pool.read() == []
+
+    pool.append([_user(1), _user(2)])
+    pool.append([_user(3)])
+    assert pool.read() == [_user(1), _user(2), _user(3)]
+    assert open(pool_filename).read().count('username') == 1
+
+
+def test_partial_rows_are_ignored(tmpdir):
+    """
+    A row which was cut off by an interrupted pool creation should neither be
+    leased nor corrupt rows appended afterwards.
+    """
+    pool_filename = str(tmpdir.join('users.csv'))
+    pool = UserPool(pool_filename)
+    pool.append([_user(1)])
+    with open(pool_filename, 'ab') as pool_file:
+        pool_file.write('user2,user2@exam')
+
+    assert pool.read() == [_user(1)]
+    pool.append([_user(3)])
+    assert pool.read() == [_user(1), _user(3)]
+
+
+def test_lease_round_robin(tmpdir):
+    """
+    Leases should be handed out in order, wrapping around once the pool is
+    used up, and shared by all UserPool instances for the same file.
+    """
+    pool_filename = str(tmpdir.join('users.csv'))
+    UserPool(pool_filename).append([_user(1), _user(2)])
+
+    first_pool = UserPool(pool_filename)
+    second_pool = UserPool(pool_filename)
+    assert first_pool.lease() == _user(1)
+    assert second_pool.lease() == _user(2)
+    assert first_pool.lease() == _user(1)
+
+
+def test_lease_empty_pool(tmpdir):
+    """
+    Leasing from an empty pool should raise an exception.
+    """
+    with pytest.raises(UserPoolError):
+        UserPool(str(tmpdir.join('users.csv'))).lease()
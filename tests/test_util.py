@@ -1,7 +1,7 @@
 """Test functions in helpers.util"""
 
 import pytest
-from helpers.util import choice_with_distribution
+from helpers.util import WeightedSampler, choice_with_distribution
 
 
 def test_choice_with_distribution():
@@ -20,3 +20,20 @@ def test_choice_with_distribution():
     assert choice_with_distribution([('a', 0.5)]) == 'a'
     with pytest.raises(ValueError):
         choice_with_distribution([])
+
+
+def test_weighted_sampler():
+    """
+    Make sure that WeightedSampler only ever chooses elements with a non-zero
+    ratio, without relying on the distribution of the return values.
+    """
+    sampler = WeightedSampler([('a', 0), ('b', 3), ('c', 0), ('d', 0.5)])
+    assert sampler.choice() in ['b', 'd']
+    assert set(sampler.sample(1000)) <= {'b', 'd'}
+    assert sampler.sample(0) == []
+    assert WeightedSampler([('a', 0), ('b', 0), ('c', 1)]).sample(100) == ['c'] * 100
+    assert WeightedSampler([('a', 0.5)]).choice() == 'a'
+    with pytest.raises(ValueError):
+        WeightedSampler([])
+    with pytest.raises(ValueError):
+        WeightedSampler([('a', 0)])
@@ -0,0 +1,96 @@
+"""
+Bulk create user accounts for the pool used by helpers.user_pool.
+
+Accounts are created concurrently through the auto_auth endpoint of the LMS and
+appended to the pool file as they come back.  Re-running the command with the
+same pool file only creates the accounts which are still missing, so an
+interrupted run can simply be resumed.
+
+Usage (from the root of edx-load-tests):
+
+    python -m util.create_user_pool --host=https://courses.example.com --count=5000 users.csv
+
+Extra auto_auth parameters can be given with --param, e.g. to enroll every
+account in a course:
+
+    python -m util.create_user_pool --host=... --count=5000 \\
+        --param=course_id=course-v1:edX+DemoX+Demo_Course users.csv
+"""
+from multiprocessing.pool import ThreadPool
+
+import click
+import requests
+
+from helpers.user_pool import UserPool
+
+
+def create_user(host, params, auth, verify):
+    """
+    Create a single user via auto_auth.
+
+    Returns:
+        dict: the auto_auth JSON response, or None if creation failed.
+    """
+    params = dict(params, no_login='true')
+    try:
+        response = requests.get(
+            '{}/auto_auth'.format(host.rstrip('/')),
+            params=params,
+            headers={'Accept': 'application/json'},
+            auth=auth,
+            verify=verify,
+        )
+        if response.status_code == 200:
+            return response.json()
+        click.echo('auto_auth failed with {}: {}'.format(response.status_code, response.content[:200]), err=True)
+    except (requests.RequestException, ValueError) as error:
+        click.echo('auto_auth failed: {}'.format(error), err=True)
+    return None
+
+
+@click.command()
+@click.option('--host', required=True, help='Root URL of the LMS.')
+@click.option('--count', type=int, required=True, help='Total number of users the pool should contain.')
+@click.option('--concurrency', type=int, default=10, help='Number of users to create in parallel.')
+@click.option('--param', multiple=True, help='Extra auto_auth parameter, as KEY=VALUE.  May be repeated.')
+@click.option('--basic-auth-user', default=None, help='Basic auth user for the LMS, if needed.')
+@click.option('--basic-auth-pass', default=None, help='Basic auth password for the LMS, if needed.')
+@click.option('--insecure', is_flag=True, help='Skip TLS certificate verification.')
+@click.argument('pool_file')
+def main(host, count, concurrency, param, basic_auth_user, basic_auth_pass, insecure, pool_file):
+    """
+    Create users until POOL_FILE contains COUNT of them.
+    """
+    params = dict(p.split('=', 1) for p in param)
+    auth = (basic_auth_user, basic_auth_pass) if basic_auth_user else None
+    pool = UserPool(pool_file)
+
+    remaining = count - len(pool.read())
+    if remaining <= 0:
+        click.echo('{} already contains {} or more users.'.format(pool_file, count))
+        return
+
+    click.echo('Creating {} users in {}'.format(remaining, pool_file))
+    workers = ThreadPool(concurrency)
+    results = workers.imap_unordered(
+        lambda __: create_user(host, params, auth, not insecure),
+        xrange(remaining),
+    )
+    created = 0
+    for user in results:
+        if user is None:
+            continue
+        pool.append([user])
+        created += 1
+        if created % 100 == 0:
+            click.echo('Created {} of {} users'.format(created, remaining))
+    workers.close()
+    workers.join()
+
+    click.echo('Created {} users, {} failed.'.format(created, remaining - created))
+    if created < remaining:
+        click.echo('Run the same command again to create the missing users.')
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
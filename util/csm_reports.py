@@ -8,6 +8,7 @@ successfully run this script.
 """
 
 import os
+import re
 import sys
 import datetime
 import click
@@ -112,6 +113,95 @@ def scatter_plot(successes, failures, label, min_time=None, max_time=None):
     return graph_plot
 
 
+# Requests of the CSM test reported by the number of blocks they read or write,
+# e.g. "get_many 5-8 blocks" or "set_many 1 block".
+BLOCK_COUNT_REQUEST_RE = re.compile(r'^(?P<method>\S+) (?:\d+-)?(?P<max_blocks>\d+) blocks?$')
+
+
+def _group_by_block_count(data_source):
+    """
+    Group the successful requests reported by block count by method.
+
+    Returns a dict mapping each method to a list of (maximum number of blocks,
+    requests) tuples, sorted by number of blocks.
+    """
+    by_method = defaultdict(list)
+    for req_type in data_source.req_types:
+        match = BLOCK_COUNT_REQUEST_RE.match(req_type)
+        if match is None:
+            continue
+        (successes, _) = data_source.get_req_data(req_type)
+        if successes:
+            by_method[match.group('method')].append((int(match.group('max_blocks')), successes))
+    for block_counts in by_method.values():
+        block_counts.sort()
+    return by_method
+
+
+def _percentiles(values):
+    return np.percentile(values, 50), np.percentile(values, 95)
+
+
+def block_count_plot(method, block_counts):
+    """
+    Plot the p50/p95 response time of a method against the number of blocks
+    per request, on log scales, where linear scaling is a slope of 1.
+    """
+    TOOLS = "resize,crosshair,pan,wheel_zoom,box_zoom,reset"
+    x = [max_blocks for (max_blocks, _) in block_counts]
+    p50s, p95s = zip(*[_percentiles([r['response_time'] for r in requests]) for (_, requests) in block_counts])
+
+    graph_plot = bokeh_figure(title='{}: response time by block count'.format(method), tools=TOOLS,
+                              x_axis_type='log', y_axis_type='log')
+    graph_plot.xaxis.axis_label = "Blocks per Request (upper bound)"
+    graph_plot.yaxis.axis_label = "Response Time (ms)"
+    graph_plot.line(x, p50s, line_color='blue', legend='p50')
+    graph_plot.circle(x, p50s, fill_color='blue')
+    graph_plot.line(x, p95s, line_color='red', legend='p95')
+    graph_plot.circle(x, p95s, fill_color='red')
+    return graph_plot
+
+
+def payload_size_plot(method, block_counts):
+    """
+    Plot the response time of each request of a method against the bytes of
+    state it read or wrote, with the p50 of each power of two bytes, on log
+    scales.
+    """
+    TOOLS = "resize,crosshair,pan,wheel_zoom,box_zoom,reset,box_select"
+    requests = [r for (_, block_count_requests) in block_counts for r in block_count_requests
+                if r['response_length'] > 0]
+    graph_plot = bokeh_figure(title='{}: response time by payload size'.format(method), tools=TOOLS,
+                              x_axis_type='log', y_axis_type='log')
+    graph_plot.xaxis.axis_label = "Payload (bytes)"
+    graph_plot.yaxis.axis_label = "Response Time (ms)"
+    if not requests:
+        return graph_plot
+
+    lengths = np.array([r['response_length'] for r in requests])
+    response_times = np.array([r['response_time'] for r in requests])
+    graph_plot.circle(lengths, response_times, size=2, fill_alpha=0.2, line_alpha=0.2)
+
+    # Bin the requests by the power of two above their payload size.
+    bins = np.ceil(np.log2(lengths)).astype(int)
+    bin_sizes = sorted(set(bins))
+    p50s = [np.percentile(response_times[bins == b], 50) for b in bin_sizes]
+    graph_plot.line([2 ** b for b in bin_sizes], p50s, line_color='red', line_width=2, legend='p50')
+    return graph_plot
+
+
+def query_shape_plots(data_source):
+    """
+    Plot how the response time of each client method scales with the number of
+    blocks and with the bytes of state per request.
+    """
+    plots = []
+    for method, block_counts in sorted(_group_by_block_count(data_source).items()):
+        plots.append(block_count_plot(method, block_counts))
+        plots.append(payload_size_plot(method, block_counts))
+    return plots
+
+
 def _connect_to_mongo(ctx):
     """
     Utility function to connect to MongoDB.
@@ -159,6 +249,9 @@ def output_report(outfile, data_source):
                 successes, failures, label=req_type, min_time=min_time, max_time=max_time
             ))
 
+    # Generate plots of response time against block count and payload size.
+    all_plots.extend(query_shape_plots(data_source))
+
     # Output an HTML report of the test run.
     script, divs = bokeh_components(all_plots)
 
@@ -0,0 +1,268 @@
+"""
+Generate the CourseData of a course from its OLX export.
+
+The course export tarball (as downloaded from Studio, or e.g.
+loadtests/discussions_api/seed_data/dapi_course.tar.gz) is streamed without
+extracting it to disk, and the blocks used by the LMS load test are pulled out
+of it:
+
+* chapters and sequentials, for the courseware paths,
+* videos and their YouTube ids,
+* capa problems, along with random inputs for the kinds of responses which can
+  be answered without knowing the problem (multiple choice, checkboxes,
+  dropdowns, and text or numerical answers given in the OLX),
+* HTML blocks.
+
+The ids of special exams (timed and proctored exams), used by the proctoring
+tasks, are assigned by edx-proctoring rather than stored in the export, so they
+are given with --special-exam-id; the special exam sequentials found in the
+export are listed to help look them up.  Without any, the course data has no
+special exams, and the proctoring tasks do nothing.
+
+Usage (from the root of edx-load-tests):
+
+    python -m util.export_course_data course.tar.gz big_course
+
+writes helpers/course_data/big_course.py, containing a FrozenCourseData named
+big_course.  Select it in the settings file of the load test with:
+
+    course_data: big_course
+
+For very large courses, --format=pickle writes helpers/course_data/big_course.pickle
+instead, which is quicker to load than the equivalent python module.
+"""
+import ast
+import cPickle as pickle
+import os
+import pprint
+import tarfile
+from xml.etree import cElementTree as ElementTree
+
+import click
+
+COURSE_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'helpers', 'course_data')
+
+# capa input elements, in the order they are numbered within a response.
+CAPA_INPUT_TAGS = (
+    'checkboxgroup', 'choicegroup', 'formulaequationinput', 'optioninput', 'radiogroup', 'textbox', 'textline',
+)
+
+# Attributes of a sequential which make it a special exam.
+SPECIAL_EXAM_ATTRIBUTES = ('is_time_limited', 'is_proctored_enabled', 'is_proctored_exam')
+
+
+def _choice_names(choice_group):
+    """
+    Return the names capa gives to the choices of a choicegroup/checkboxgroup.
+    """
+    return [
+        choice.get('name') or 'choice_{}'.format(index)
+        for index, choice in enumerate(choice_group.iter('choice'))
+    ]
+
+
+def _option_names(option_input):
+    """
+    Return the options of an optioninput, given either as option elements or
+    as a python tuple in the "options" attribute.
+    """
+    options = [option.text.strip() for option in option_input.iter('option') if option.text]
+    if not options and option_input.get('options'):
+        try:
+            options = list(ast.literal_eval(option_input.get('options')))
+        except (SyntaxError, ValueError):
+            pass
+    return options
+
+
+def capa_inputs(problem):
+    """
+    Return the possible inputs of the answerable responses of a capa problem.
+
+    Capa numbers the responses of a problem from 2, and the inputs of each
+    response from 1, so that the first input is "<problem_id>_2_1".
+
+    Arguments:
+        problem (Element): the parsed problem OLX.
+
+    Returns:
+        dict mapping input keys (e.g. "_2_1") to lists of values.
+    """
+    inputs = {}
+    responses = [element for element in problem.iter() if element.tag.endswith('response')]
+    for response_index, response in enumerate(responses, 2):
+        input_elements = [element for element in response.iter() if element.tag in CAPA_INPUT_TAGS]
+        for input_index, input_element in enumerate(input_elements, 1):
+            key = '_{}_{}'.format(response_index, input_index)
+            if input_element.tag in ('choicegroup', 'radiogroup'):
+                values = _choice_names(input_element)
+            elif input_element.tag == 'checkboxgroup':
+                key += '[]'
+                values = _choice_names(input_element)
+            elif input_element.tag == 'optioninput':
+                values = _option_names(input_element)
+            elif response.get('answer'):
+                values = [response.get('answer')]
+            else:
+                values = []
+            if values:
+                inputs[key] = values
+    return inputs
+
+
+class CourseExport(object):
+    """
+    The blocks of a course export which are of interest to the LMS load test.
+    """
+
+    def __init__(self):
+        self.org = self.course = self.run = None
+        self.chapters = {}
+        self.chapter_order = []
+        self.sequential_ids = []
+        self.special_exam_sequential_ids = []
+        self.video_module_ids = []
+        self.video_ids = []
+        self.capa_problems = {}
+        self.html_ids = []
+
+    def read(self, tarball):
+        """
+        Stream the course export tarball, parsing each OLX file as it comes.
+        """
+        with tarfile.open(tarball, 'r|gz') as export:
+            for member in export:
+                if not member.isfile() or not member.name.endswith('.xml'):
+                    continue
+                # Only <root>/course.xml and <root>/<category>/<url_name>.xml
+                # are published blocks (e.g. drafts/ are one level deeper).
+                parts = member.name.split('/')
+                if len(parts) == 2:
+                    category = 'root'
+                elif len(parts) == 3:
+                    category = parts[1]
+                else:
+                    continue
+                url_name = os.path.splitext(parts[-1])[0]
+                handler = getattr(self, '_read_' + category, None)
+                if handler is not None:
+                    handler(url_name, ElementTree.parse(export.extractfile(member)).getroot())
+
+    def _read_root(self, url_name, element):
+        if element.tag == 'course':
+            self.org, self.course, self.run = element.get('org'), element.get('course'), element.get('url_name')
+
+    def _read_course(self, url_name, element):
+        self.chapter_order = [chapter.get('url_name') for chapter in element.iter('chapter')]
+
+    def _read_chapter(self, url_name, element):
+        self.chapters[url_name] = [sequential.get('url_name') for sequential in element.iter('sequential')]
+
+    def _read_sequential(self, url_name, element):
+        self.sequential_ids.append(url_name)
+        if any(element.get(attribute) == 'true' for attribute in SPECIAL_EXAM_ATTRIBUTES):
+            self.special_exam_sequential_ids.append(url_name)
+
+    def _read_video(self, url_name, element):
+        self.video_module_ids.append(url_name)
+        youtube_id = element.get('youtube_id_1_0')
+        if not youtube_id and element.get('youtube'):
+            # e.g. youtube="0.75:abc,1.00:def"
+            speeds = dict(speed.split(':', 1) for speed in element.get('youtube').split(',') if ':' in speed)
+            youtube_id = speeds.get('1.00') or speeds.get('1.0')
+        if youtube_id:
+            self.video_ids.append(youtube_id)
+
+    def _read_problem(self, url_name, element):
+        problem = {}
+        inputs = capa_inputs(element)
+        if inputs:
+            problem['inputs'] = inputs
+        if element.get('showanswer'):
+            problem['showanswer'] = element.get('showanswer')
+        self.capa_problems[url_name] = problem
+
+    def _read_html(self, url_name, element):
+        self.html_ids.append(url_name)
+
+    @property
+    def courseware_paths(self):
+        """
+        The courseware paths of the course home and of every sequential, in
+        course order.
+        """
+        paths = ['']
+        for chapter in self.chapter_order:
+            for sequential in self.chapters.get(chapter, []):
+                paths.append('/{}/{}/'.format(chapter, sequential))
+        return paths
+
+    def course_data(self, special_exam_ids=()):
+        """
+        Return the keyword arguments of the CourseData of this course, with the
+        given edx-proctoring ids of its special exams.
+        """
+        return dict(
+            sequential_ids=tuple(sorted(self.sequential_ids)),
+            special_exam_ids=tuple(special_exam_ids),
+            capa_problems=self.capa_problems,
+            video_module_ids=tuple(sorted(self.video_module_ids)),
+            video_ids=tuple(sorted(set(self.video_ids))),
+            courseware_paths=tuple(self.courseware_paths),
+            html_usage_ids=tuple(
+                'block-v1:{}+{}+{}+type@html+block@{}'.format(self.org, self.course, self.run, html_id)
+                for html_id in sorted(self.html_ids)
+            ),
+        )
+
+
+def write_module(filename, name, tarball, course_data):
+    with open(filename, 'w') as module:
+        module.write('"""\nGenerated by util/export_course_data.py from {}.\n"""\n'.format(os.path.basename(tarball)))
+        module.write('from helpers.course_data import FrozenCourseData\n\n')
+        module.write('{} = FrozenCourseData(\n'.format(name))
+        for key, value in sorted(course_data.items()):
+            module.write('    {}={},\n'.format(key, pprint.pformat(value)))
+        module.write(')\n')
+
+
+def write_pickle(filename, course_data):
+    with open(filename, 'wb') as pickle_file:
+        pickle.dump(course_data, pickle_file, pickle.HIGHEST_PROTOCOL)
+
+
+@click.command()
+@click.option('--format', 'output_format', type=click.Choice(['module', 'pickle']), default='module',
+              help='Write a python module (default) or a pickle.')
+@click.option('--output-dir', default=COURSE_DATA_DIR, help='Where to write the course data.')
+@click.option('--special-exam-id', 'special_exam_ids', type=int, multiple=True,
+              help='The edx-proctoring id of a special exam of the course (repeatable).')
+@click.argument('tarball')
+@click.argument('name')
+def main(output_format, output_dir, special_exam_ids, tarball, name):
+    """
+    Generate the CourseData called NAME from the course export TARBALL.
+    """
+    export = CourseExport()
+    export.read(tarball)
+    course_data = export.course_data(special_exam_ids)
+
+    if output_format == 'module':
+        filename = os.path.join(output_dir, name + '.py')
+        write_module(filename, name, tarball, course_data)
+    else:
+        filename = os.path.join(output_dir, name + '.pickle')
+        write_pickle(filename, course_data)
+
+    click.echo('Wrote {}:'.format(filename))
+    for key, value in sorted(course_data.items()):
+        click.echo('    {}: {}'.format(key, len(value)))
+    if export.special_exam_sequential_ids and not special_exam_ids:
+        click.echo('The course has special exams, but no --special-exam-id was given.  Their sequentials are:')
+        for url_name in sorted(export.special_exam_sequential_ids):
+            click.echo('    {}'.format(url_name))
+    click.echo('Set "course_data: {}" in the settings file to use it.'.format(name))
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
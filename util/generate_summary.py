@@ -19,9 +19,13 @@ Output:
     * timeline:
         * begin: ISO 8601 date for when the test began.
         * end: ISO 8601 date for when the test ended.
+    * import_stages (course_import load tests only):
+        * list of the count, failures, p50 and p95 (in seconds) of each stage
+          of the course imports.
 """
 from datetime import timedelta
 import yaml
+import helpers.import_timeline
 import helpers.markers
 from util.app_monitors_config import MONITORS
 
@@ -68,6 +72,26 @@ def get_time_bounds(logfile):
     return (begin_time, end_time)
 
 
+def get_import_stage_summary(logfile):
+    """
+    Summarize the durations of the stages of course imports.
+
+    Parameters:
+        logfile (file): the file containing locust logs for a single load test
+
+    Returns:
+        list of dicts: see helpers.import_timeline.summarize(), empty if no
+            course imports were logged.
+    """
+    all_durations = (
+        helpers.import_timeline.parse_logfile_stage_durations(line)
+        for line in logfile
+    )
+    return helpers.import_timeline.summarize(
+        durations for durations in all_durations if durations is not None
+    )
+
+
 def main():
     """
     Generate a summary of a previous load test run.
@@ -76,6 +100,8 @@ def main():
     """
     with open(STANDARD_LOGFILE_PATH) as logfile:
         loadtest_begin_time, loadtest_end_time = get_time_bounds(logfile)
+        logfile.seek(0)
+        import_stages = get_import_stage_summary(logfile)
 
     monitoring_links = []
     for monitor in MONITORS:
@@ -93,14 +119,17 @@ def main():
                 loadtest_end_time.strftime('%Y-%m-%dT%H:%M:%SZ'),
             ),
         })
-    print(yaml.dump(
-        {
-            'timeline': {
-                'begin': loadtest_begin_time.strftime('%Y-%m-%dT%H:%M:%SZ'),
-                'end': loadtest_end_time.strftime('%Y-%m-%dT%H:%M:%SZ'),
-            },
-            'monitoring_links': monitoring_links
+    summary = {
+        'timeline': {
+            'begin': loadtest_begin_time.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'end': loadtest_end_time.strftime('%Y-%m-%dT%H:%M:%SZ'),
         },
+        'monitoring_links': monitoring_links
+    }
+    if import_stages:
+        summary['import_stages'] = import_stages
+    print(yaml.dump(
+        summary,
         default_flow_style=False,  # Represent objects using indented blocks
                                    # rather than inline enclosures.
         allow_unicode=True,